@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+
+# How the chart data gets to the browser:
+#   inline  (default) streamlit sends each chart's datasets along with it, as arrow, on every rerun
+#   url     every dataset is written once to static/chart_data/ and the charts reference it by url, so the
+#           browser downloads it once (gzipped by the server) and then serves it from its http cache.
+#           Needs streamlit's static file serving, which `python warmup.py serve` turns on by itself:
+#           CIJ_CHART_DATA=url streamlit run app.py --server.enableStaticServing=true
+CHART_DATA_MODE = os.environ.get('CIJ_CHART_DATA', 'inline')
+USE_URLS = CHART_DATA_MODE == 'url'
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DATA_DIR = os.path.join(STATIC_DIR, 'chart_data')
+
+# names of the datasets already written by this process
+_written = set()
+
+def write_dataset(values):
+
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    # named after the content, so a changed dataset gets a new url rather than a stale cached copy
+    name = hashlib.sha1(payload).hexdigest()[:16]
+
+    if name not in _written:
+        path = os.path.join(DATA_DIR, f'{name}.json')
+        if not os.path.exists(path):
+            os.makedirs(DATA_DIR, exist_ok=True)
+            # several sessions can render the same chart at once
+            temp_path = f'{path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        _written.add(name)
+
+    # the ?v= argument makes the server send a long lived Cache-Control header
+    return f'app/static/chart_data/{name}.json?v={name}'
+
+def replace_data(spec, urls):
+
+    if isinstance(spec, dict):
+        return {
+            key: {'url': urls[value['name']], 'format': {'type': 'json'}}
+            if key == 'data' and isinstance(value, dict) and value.get('name') in urls
+            else replace_data(value, urls)
+            for key, value in spec.items()
+        }
+    if isinstance(spec, list):
+        return [replace_data(item, urls) for item in spec]
+
+    return spec
+
+# the chart's vega-lite spec, with every inline dataset swapped for a url to a static file
+def url_spec(chart):
+
+    spec = chart.to_dict()
+    urls = {name: write_dataset(values) for name, values in spec.pop('datasets', {}).items()}
+
+    return replace_data(spec, urls)
+
+# the other way around: a spec from url_spec with its datasets read back from the static files and inlined,
+# for exports that are opened without the app's static file server
+def inline_spec(spec):
+
+    if isinstance(spec, dict):
+        data = spec.get('url', '')
+        if isinstance(data, str) and data.startswith('app/static/chart_data/'):
+            name = data.split('/')[-1].split('?')[0]
+            with open(os.path.join(DATA_DIR, name), encoding='utf-8') as f:
+                return {'values': json.load(f)}
+        return {key: inline_spec(value) for key, value in spec.items()}
+    if isinstance(spec, list):
+        return [inline_spec(item) for item in spec]
+
+    return spec
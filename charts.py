@@ -0,0 +1,1847 @@
+import io
+
+import numpy as np
+import pandas as pd
+import altair as alt
+import matplotlib.pyplot as plt
+import seaborn as sns
+from PIL import Image
+
+import coverage
+import drift
+import effect_sizes
+import kde
+import known_words
+import partitions
+import projection
+import recommender
+import video_index
+import word_counts
+from corpora import DEFAULT_CORPUS, get_corpus, read_tables
+from instrumentation import timed_cache_data, timed_cache_resource
+
+# functions for loading data
+@timed_cache_data
+def load_dataframes(corpus=DEFAULT_CORPUS):
+
+    return read_tables(corpus)
+
+# levels (easiest first) and their chart colors
+def get_levels(corpus=DEFAULT_CORPUS):
+
+    corpus_info = get_corpus(corpus)
+
+    return corpus_info['levels'], corpus_info['colors']
+
+# title of the level legends, e.g. 'CIJ Level'
+def get_level_title(corpus=DEFAULT_CORPUS):
+
+    return get_corpus(corpus)['level_title']
+
+MEDIAN_RULE_COLORS = ['red', 'green', 'blue', 'yellow']
+# yellow text is hard to read on white, so the labels use orange instead
+MEDIAN_LABEL_COLORS = ['red', 'green', 'blue', 'orange']
+
+# colors of the median rules and of their labels, one per level: the colors above for up to four levels,
+# evenly spaced hues for more
+def get_median_colors(corpus=DEFAULT_CORPUS):
+
+    n_levels = len(get_corpus(corpus)['levels'])
+    if n_levels <= len(MEDIAN_RULE_COLORS):
+        return MEDIAN_RULE_COLORS[:n_levels], MEDIAN_LABEL_COLORS[:n_levels]
+
+    colors = sns.color_palette('husl', n_levels).as_hex()
+    return colors, colors
+
+# the videos and coverage curves split into contiguous per-level blocks (see partitions.py)
+@timed_cache_data
+def get_level_partitions(corpus=DEFAULT_CORPUS):
+
+    video_df, word_coverage_df, _ = load_dataframes(corpus)
+    levels, _ = get_levels(corpus)
+
+    return partitions.build_partitions(video_df, word_coverage_df, levels, list(METRIC_LABELS))
+
+# median of a column for every level, in the shape the vertical median lines expect
+def get_median_lines(column, decimals, scale=1.0, corpus=DEFAULT_CORPUS):
+
+    level_partitions = get_level_partitions(corpus=corpus)
+    medians = partitions.level_quantiles(level_partitions, column, 0.5, scale=scale)
+    levels = level_partitions['levels']
+
+    return pd.DataFrame({
+        # rounds halves up, like the labels on the lines
+        'x': np.floor(medians[levels].to_numpy() * 10 ** decimals + 0.5) / 10 ** decimals,
+        'level': levels,
+        'text': levels
+    })
+
+# Cliff's delta, KS statistic and histogram overlap of every metric between every pair of levels
+# (see effect_sizes.py), computed for all the metrics at once
+@timed_cache_data
+def get_effect_sizes(corpus=DEFAULT_CORPUS):
+
+    return effect_sizes.effect_size_table(get_level_partitions(corpus=corpus), list(METRIC_LABELS))
+
+# the effect sizes between neighbouring levels of every metric as one table, for the static report
+# (the app shows one metric at a time)
+def get_effect_size_table(corpus=DEFAULT_CORPUS):
+
+    effects = get_effect_sizes(corpus=corpus)
+    effects = effects[effects['adjacent']]
+
+    table = pd.DataFrame({
+        'Statistic': effects['metric'].map(METRIC_LABELS),
+        'Level': effects['easier'],
+        'vs. level': effects['harder'],
+        "Cliff's delta": effects['cliffs_delta'],
+        'KS statistic': effects['ks'],
+        'Overlap': effects['overlap'],
+    })
+
+    return table.style.format({"Cliff's delta": '{:+.2f}', 'KS statistic': '{:.2f}', 'Overlap': '{:.2f}'}).hide(axis='index')
+
+# histogram subtitle with how far apart each level is from the next one
+def get_separation_subtitle(column, corpus=DEFAULT_CORPUS):
+
+    effects = get_effect_sizes(corpus=corpus)
+    effects = effects[(effects['metric'] == column) & effects['adjacent']]
+
+    return ["Cliff's delta and histogram overlap between neighbouring levels:"] + [
+        f"{row.easier} → {row.harder}: δ = {row.cliffs_delta:+.2f}, overlap {row.overlap:.0%}"
+        for row in effects.itertuples()
+    ]
+
+# smoothed density of a column in every level (see kde.py), at a fixed number of points per level
+@timed_cache_data
+def get_level_densities(column, scale=1.0, max_value=None, corpus=DEFAULT_CORPUS):
+
+    return kde.level_densities(get_level_partitions(corpus=corpus), column, scale=scale, max_value=max_value)
+
+# density curves to overlay on a histogram. They get their own (hidden) y scale, so each curve keeps
+# the shape of its level's histogram whatever the bin width
+def get_density_lines(column, scale=1.0, max_value=None, corpus=DEFAULT_CORPUS):
+
+    levels, colors = get_levels(corpus)
+
+    return alt.Chart(get_level_densities(column, scale=scale, max_value=max_value, corpus=corpus)).mark_line(
+        strokeWidth=3,
+        interpolate='monotone'
+    ).encode(
+        x='x:Q',
+        y=alt.Y('density:Q', axis=None),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+# colors the header of every level column with the level's color
+def style_level_table(df, levels, colors):
+
+    styles = {}
+    for level, color in zip(levels, colors):
+        red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+        styles[level] = [
+            {'selector': 'th.col_heading.level0', 'props': [('background-color', f'rgba({red}, {green}, {blue}, 0.45)')]},
+            {'selector': 'td:hover', 'props': [('background-color', '#e0f7fa')]}
+        ]
+
+    return df.style.set_table_styles(styles).set_properties(**{'background-color': 'white'}).format("{:.2%}")
+
+def get_grammar_table(corpus=DEFAULT_CORPUS):
+
+    levels, colors = get_levels(corpus)
+
+    row_labels = {
+        'sconj_props': 'Median Perc. Subordinating Conjunctions',
+        'adv_props': 'Median Perc. Adverbs',
+        'det_props': 'Median Perc. Determiners',
+        'noun_props': 'Median Perc. Nouns',
+        'aux_props': 'Median Perc. Auxiliaries',
+        'num_props': 'Median Perc. Numerals',
+        'pron_props': 'Median Perc. Pronouns',
+        'verb_props': 'Median Perc. Verbs'
+    }
+    df = partitions.level_medians(get_level_partitions(corpus=corpus), list(row_labels)).T[levels]
+    df.index = list(row_labels.values())
+    df.columns.name = None
+
+    return style_level_table(df, levels, colors)
+
+def get_word_origin_table(corpus=DEFAULT_CORPUS):
+
+    levels, colors = get_levels(corpus)
+
+    row_labels = {
+        'kan_props': 'Median Perc. Kango (漢語)',
+        'wa_props': 'Median Perc. Wago (和語)',
+        'gai_props': 'Median Perc. Garaigo (外来語)'
+    }
+    df = partitions.level_medians(get_level_partitions(corpus=corpus), list(row_labels)).T[levels]
+    df.index = list(row_labels.values())
+    df.columns.name = None
+
+    return style_level_table(df, levels, colors)
+
+# functions for loading data visualizations
+@timed_cache_data
+def get_wpm_chart(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    line_data = get_median_lines('wpm', 0, corpus=corpus)
+
+    # every chart only gets the columns it encodes, since its data is sent to the browser along with it
+    histogram = alt.Chart(video_df[['level', 'wpm']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'wpm:Q',
+            bin=alt.Bin(maxbins=20),
+            title='Words per minute',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,100])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('wpm:Q', title='Words per minute:', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        height=500,
+        title=alt.TitleParams(
+            text='Rate of speech in words per minute (WPM)',
+            subtitle=get_separation_subtitle('wpm', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median WPM:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.0f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+
+    if show_medians:
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+    else:
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('wpm', corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_wpm_vs_sps_chart(interactive=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    scatter_plot = alt.Chart(video_df[['video', 'level', 'wpm', 'sps']]).mark_circle(
+        cursor='pointer',
+        size=80,
+    ).encode(
+        x=alt.X(
+            'wpm:Q',
+            scale=alt.Scale(domain=[30,215]),
+            title='Words per minute',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        y=alt.Y(
+            'sps:Q',
+            title='Syllables per second',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+            ),
+        ),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                orient='right',
+                direction='vertical',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('video:N', title='Video number:'),
+            alt.Tooltip('wpm:Q', title='WPM:'),
+            alt.Tooltip('sps:Q', title='SPS:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.2)),
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Rate of speech: Syllables per second vs. words per minute',
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    ).configure(
+        background='white'
+    )
+
+    if interactive:
+        return scatter_plot.interactive()
+    else:
+        return scatter_plot
+
+@timed_cache_data
+def get_sentence_length_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    line_data = get_median_lines('mean_sentence_length', 2, corpus=corpus)
+
+    histogram = alt.Chart(video_df[['level', 'mean_sentence_length']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'mean_sentence_length:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Words per sentence',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,100])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('mean_sentence_length:Q', title='Average sentence length:', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Average sentence length (words per sentence)',
+            subtitle=get_separation_subtitle('mean_sentence_length', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median avg. sentence length:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.2f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    if show_medians:
+
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+
+    else:
+
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('mean_sentence_length', corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_repetition_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    video_df['average_rel_reps_perc'] = 100.0 * video_df['average_rel_reps']
+
+    sub_video_df = video_df[video_df['average_rel_reps_perc'] <= 2.0]
+
+    line_data = get_median_lines('average_rel_reps', 2, scale=100.0, corpus=corpus)
+
+    histogram = alt.Chart(sub_video_df[['level', 'average_rel_reps', 'average_rel_reps_perc']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'average_rel_reps_perc:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Word repetitions (%)',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+            ),
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,100])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('average_rel_reps:Q', title='Average repetitions (%):', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Average amount of repetition per word',
+            subtitle=get_separation_subtitle('average_rel_reps', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        alt.X(
+            'x:Q'
+        ),
+        tooltip=[
+            alt.Tooltip('x:N', title='Median avg. repetitions (%):'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1)),
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        alt.X(
+            'x:Q'
+        ),
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.2f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    if show_medians:
+
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+
+    else:
+
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('average_rel_reps', scale=100.0, max_value=2.0, corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_word_coverage_chart(zoom=False, corpus=DEFAULT_CORPUS):
+
+    _, word_coverage_df, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    if zoom:
+        word_coverage_df_sub = word_coverage_df.loc[word_coverage_df['coverage_perc']>=90]
+    else:
+        word_coverage_df_sub = word_coverage_df
+
+    # the same vocab sizes as the explorer's (the corpus' exact ones, or interpolated on the curves)
+    coverage_98 = coverage.vocab_for_coverage(get_coverage_engine(corpus=corpus), 98.0)
+    line_levels = [level for level in levels if coverage_98[level] is not None]
+
+    line_data = pd.DataFrame({
+        'x': [coverage_98[level] for level in line_levels],
+        'level': line_levels,
+        'text': line_levels
+    })
+
+    line_chart = alt.Chart(word_coverage_df_sub).mark_line(
+        cursor='pointer',
+        point=False,
+    ).encode(
+        x=alt.X(
+            'rank:Q',
+            scale=alt.Scale(domain=[1000,16000]) if zoom else alt.Scale(domain=[-10,16000]),
+            title='Number of words known',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        y=alt.Y(
+            'coverage_perc:Q',
+            scale=alt.Scale(domain=[90,101]) if zoom else alt.Scale(domain=[0,105]),
+            title='% of words understood',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+        ),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                orient='right',
+                direction='vertical',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('word:N', title='Word: '),
+            alt.Tooltip('rank:Q', title="CIJ rank: "),
+            alt.Tooltip('coverage_perc_str:N', title='Word coverage: '),
+            alt.Tooltip('level:N', title='Curve: ')
+        ],
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.2)),
+        strokeWidth=alt.condition(selection | highlight, alt.value(6), alt.value(2))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Word coverage curves',
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=4,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Words needed to reach 98%:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.0f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    layered_chart = alt.layer(line_chart, vertical_lines, text_labels, background='white')
+
+    return layered_chart
+
+@timed_cache_data
+def get_ne_spot_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    line_data = get_median_lines('ne_spot', 0, corpus=corpus)
+
+    histogram = alt.Chart(video_df[['level', 'ne_spot']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'ne_spot:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Number of words known',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,40])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('ne_spot:Q', title='Vocab size for 98%.:', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Vocab size needed for 98% coverage (videos)',
+            subtitle=get_separation_subtitle('ne_spot', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median vocab size needed for 98% cov:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.0f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    
+    if show_medians:
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+    else:
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('ne_spot', corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_tfplr_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    line_data = get_median_lines('tfp_log_ranks_unique', 2, corpus=corpus)
+
+    histogram = alt.Chart(video_df[['level', 'tfp_log_ranks_unique']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'tfp_log_ranks_unique:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Log ranks',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=30,
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,80])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('tfp_log_ranks_unique:Q', title='25th perc. log rank:', bin=True),  # Properly indicate that `wpm` is binned
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='25th percentile word-frequency log ranks',
+            subtitle=get_separation_subtitle('tfp_log_ranks_unique', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median 25th perc. log rank:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.2f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    if show_medians:
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+    else:
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('tfp_log_ranks_unique', corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_sconj_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    video_df['sconj_props_perc'] = 100.0 * video_df['sconj_props']
+
+    line_data = get_median_lines('sconj_props', 2, scale=100.0, corpus=corpus)
+
+    histogram = alt.Chart(video_df[['level', 'sconj_props_perc']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'sconj_props_perc:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Percentage of sub. conj.',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=30,
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,50])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('sconj_props_perc:Q', title='Perc. sub. conj:', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Frequency of subordinating conjunctions',
+            subtitle=get_separation_subtitle('sconj_props', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median perc. of sub. conj:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.2f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    
+    if show_medians:
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+    else:
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('sconj_props', scale=100.0, corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+@timed_cache_data
+def get_kango_hist(show_medians=False, show_density=False, corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+    levels, colors = get_levels(corpus)
+
+    video_df['kan_props_perc'] = 100.0 * video_df['kan_props']
+
+    line_data = get_median_lines('kan_props', 2, scale=100.0, corpus=corpus)
+
+    histogram = alt.Chart(video_df[['level', 'kan_props_perc']]).mark_bar(
+        opacity=0.5,
+        binSpacing=3,
+        stroke='black',
+        strokeWidth=0,
+        cornerRadius=5,
+        cursor="pointer"
+    ).encode(
+        alt.X(
+            'kan_props_perc:Q',
+            bin=alt.Bin(maxbins=30),
+            title='Percentage of kango',
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=30,
+            )
+        ),
+        alt.Y(
+            'count()', 
+            title="Num. videos",
+            axis=alt.Axis(
+                labelFontSize=14, 
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+                tickCount=5
+            ),
+            scale=alt.Scale(domain=[0,40])
+        ).stack(None),
+        alt.Color(
+            'level:N', 
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                symbolStrokeWidth=0,
+                orient='right',
+                direction='vertical',
+                fillColor='white',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('kan_props_perc:Q', title='Percentage of kango:', bin=True),
+            alt.Tooltip('count()', title='Video count:'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(2), alt.value(1))
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='Frequency of kango',
+            subtitle=get_separation_subtitle('kan_props', corpus=corpus),
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    vertical_lines = alt.Chart(line_data).mark_rule(
+        color='red',
+        strokeWidth=6,
+        strokeDash = [10, 2],
+    ).encode(
+        x='x:Q',
+        tooltip=[
+            alt.Tooltip('x:N', title='Median perc. kango:'),
+            alt.Tooltip('level:N', title='Level:')
+        ],
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[0]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+        strokeWidth=alt.condition(highlight, alt.value(20), alt.value(1))
+    ).add_params(
+        selection,
+        highlight
+    )
+
+    text_labels = alt.Chart(line_data).mark_text(
+        align='center',
+        dx=0,
+        dy=-10,
+        fontSize=16,
+        fontWeight='bold'
+    ).encode(
+        x='x:Q',
+        y=alt.value(0),
+        text=alt.Text('x:Q', format='.0f'),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=get_median_colors(corpus)[1]),
+            sort=levels,
+            legend=None
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    if show_medians:
+        layered_chart = alt.layer(histogram, vertical_lines, text_labels, background='white')
+    else:
+        layered_chart = alt.layer(histogram, background='white')
+
+    if show_density:
+        layered_chart = (layered_chart + get_density_lines('kan_props', scale=100.0, corpus=corpus)).resolve_scale(y='independent')
+
+    return layered_chart
+
+# st.image resizes (and re-encodes) every image wider than the page on every call
+MAX_IMAGE_WIDTH = 1460
+
+# renders a matplotlib figure the same way st.pyplot does, but returns the png
+# bytes so the heatmaps can be cached (and warmed up) outside of a script run.
+# Wide figures are downscaled to the page width here, once, so a rerun only sends the bytes.
+def figure_to_png(fig):
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=200)
+    plt.close(fig)
+
+    image = Image.open(buffer)
+    if image.width > MAX_IMAGE_WIDTH:
+        image = image.resize((MAX_IMAGE_WIDTH, round(image.height * MAX_IMAGE_WIDTH / image.width)), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='png', optimize=True)
+
+    return buffer.getvalue()
+
+@timed_cache_data
+def render_vanilla_heatmap(corpus=DEFAULT_CORPUS):
+
+    _, _, num_video_df = load_dataframes(corpus)
+
+    corr_matrix = num_video_df.corr()
+
+    variable_of_interest = 'Level'
+
+    sorted_vars = corr_matrix[variable_of_interest].sort_values(ascending=False).index
+
+    sorted_corr_matrix = corr_matrix.loc[sorted_vars, sorted_vars]
+
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(sorted_corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
+
+    return figure_to_png(fig)
+
+@timed_cache_data
+def render_level_row_unordered(corpus=DEFAULT_CORPUS):
+
+    _, _, num_video_df = load_dataframes(corpus)
+
+    corr_matrix = num_video_df.drop(['Proportion of determiners', 'Proportion of nouns', 'Proportion of wago', 'Proportion of gairaigo', 'Proportion of verbs', 'Proportion of numerals'], axis=1).corr()
+
+    variable_of_interest = 'Level'
+
+    sorted_vars = corr_matrix[variable_of_interest].sort_values(ascending=False).index
+
+    sorted_vars = sorted_vars.drop(variable_of_interest)
+
+    first_row_matrix = corr_matrix.loc[[variable_of_interest], sorted_vars]
+
+    fig = plt.figure(figsize=(10, 1))
+    sns.heatmap(first_row_matrix, annot=True, cmap='coolwarm', fmt=".3f", cbar_kws={'label': 'Correlation'})
+
+    return figure_to_png(fig)
+
+@timed_cache_data
+def render_level_col_ordered(corpus=DEFAULT_CORPUS):
+
+    _, _, num_video_df = load_dataframes(corpus)
+
+    corr_matrix = num_video_df.drop(['Proportion of determiners', 'Proportion of nouns', 'Proportion of wago', 'Proportion of gairaigo', 'Proportion of verbs', 'Proportion of numerals'], axis=1).corr()
+
+    variable_of_interest = 'Level'
+
+    correlations = corr_matrix[variable_of_interest]
+
+    sorted_vars = correlations.abs().sort_values(ascending=False).index
+
+    sorted_vars = sorted_vars.drop(variable_of_interest)
+
+    sorted_corr_matrix = corr_matrix.loc[[variable_of_interest], sorted_vars]
+
+    transposed_corr_matrix = sorted_corr_matrix.T
+
+    fig = plt.figure(figsize=(2, 3))
+    sns.heatmap(transposed_corr_matrix, annot=True, cmap='coolwarm', fmt=".3f", cbar_kws={'label': 'Correlation'})
+
+    return figure_to_png(fig)
+
+# allows interactivity in the vega altair plots
+selection = alt.selection_point(fields=['level'], bind='legend', on='click')
+highlight = alt.selection_point(name="highlight", fields=['level'], on='mouseover', empty=False)
+
+# the factors that correlate the most with the level, strongest first (see the heatmaps)
+MOST_IMPORTANT_FACTORS = [
+    'Rate of Speech',
+    'Sentence length',
+    'Amount of repetition of words',
+    'How rare the words are',
+    'Amount of subordinating conjunctions',
+    'Vocabulary size',
+    'Amount of pronouns',
+    'Amount of adverbs',
+    'Amount of auxiliaries',
+    'Amount of Chinese words',
+]
+
+# functions for the per-video drill-down
+
+# readable names for the per-video metrics in video_data.tsv (same wording as num_video_df.tsv)
+METRIC_LABELS = {
+    'wpm': 'Words per minute',
+    'sps': 'Syllables per second',
+    'mean_sentence_length': 'Average sentence length',
+    'average_rel_reps': 'Average relative repetitions',
+    'ne_spot': 'Vocab size needed for 98% word coverage',
+    'tfp_log_ranks_unique': 'Twenty fifth perc. log rank (unique words)',
+    'adv_props': 'Proportion of adverbs',
+    'det_props': 'Proportion of determiners',
+    'noun_props': 'Proportion of nouns',
+    'sconj_props': 'Proportion of subordinating conjunctions',
+    'wa_props': 'Proportion of wago',
+    'gai_props': 'Proportion of gairaigo',
+    'kan_props': 'Proportion of kango',
+    'aux_props': 'Proportion of auxiliaries',
+    'num_props': 'Proportion of numerals',
+    'pron_props': 'Proportion of pronouns',
+    'verb_props': 'Proportion of verbs',
+}
+
+# indexes the videos by id and ranks every metric within each level in one pass,
+# so looking up a video is an index lookup rather than a filter over video_df.
+# Shared rather than copied out of the cache on every rerun, since a lookup only reads one row:
+# (values with the level, metric values, percentiles within the level, level medians), the last three
+# as float arrays with the metrics in METRIC_LABELS order (and the medians in level order)
+@timed_cache_resource
+def get_video_profiles(corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+
+    metrics = list(METRIC_LABELS)
+
+    values = video_df.set_index('video')[['level'] + metrics]
+    percentiles = 100.0 * video_df.groupby('level')[metrics].rank(pct=True)
+    level_medians = partitions.level_medians(get_level_partitions(corpus=corpus), metrics)
+
+    return (
+        values,
+        values[metrics].to_numpy(dtype=np.float64),
+        percentiles.to_numpy(dtype=np.float64),
+        level_medians.reindex(get_levels(corpus)[0]).to_numpy(dtype=np.float64),
+    )
+
+def get_video_profile(video, corpus=DEFAULT_CORPUS):
+
+    values, metric_values, percentiles, level_medians = get_video_profiles(corpus=corpus)
+
+    row = values.index.get_loc(video)
+    level = values['level'].iat[row]
+    level_row = get_levels(corpus)[0].index(level)
+
+    profile = pd.DataFrame({
+        'Value': metric_values[row],
+        f"Median ({level})": level_medians[level_row],
+        'Percentile within level': percentiles[row],
+    }, index=list(METRIC_LABELS.values()))
+
+    return level, profile
+
+# the videos of the given levels, as slices of the per-level partitions
+def get_level_videos(levels, corpus=DEFAULT_CORPUS):
+
+    level_partitions = get_level_partitions(corpus=corpus)
+
+    if not levels:
+        return level_partitions['video_df'].iloc[:0]
+
+    return pd.concat([partitions.level_videos(level_partitions, level) for level in levels], ignore_index=True)
+
+def get_level_export(levels, corpus=DEFAULT_CORPUS):
+
+    return get_level_videos(levels, corpus=corpus).to_csv(sep='\t', index=False).encode('utf-8')
+
+# sorted indexes over every metric, for the video filters (see video_index.py)
+@timed_cache_resource
+def get_video_index(corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+
+    return video_index.build_index(video_df, list(METRIC_LABELS))
+
+# smallest and largest value of a metric, for the filter sliders
+def get_metric_range(column, corpus=DEFAULT_CORPUS):
+
+    sorted_values = get_video_index(corpus=corpus)['columns'][column]['sorted']
+    sorted_values = sorted_values[~np.isnan(sorted_values)]
+
+    return float(sorted_values[0]), float(sorted_values[-1])
+
+# the videos with every metric in ranges within its (low, high) range and one of the levels
+def find_videos(ranges, levels, corpus=DEFAULT_CORPUS):
+
+    video_ids = video_index.query(get_video_index(corpus=corpus), ranges, levels=levels)
+    values = get_video_profiles(corpus=corpus)[0]
+
+    return values.loc[video_ids, ['level'] + list(ranges)].rename(columns=METRIC_LABELS)
+
+# functions for the vocabulary size explorer
+@timed_cache_resource
+def get_coverage_engine(corpus=DEFAULT_CORPUS):
+
+    video_df, word_coverage_df, _ = load_dataframes(corpus)
+    levels, _ = get_levels(corpus)
+
+    return coverage.build_engine(video_df, word_coverage_df, levels, get_corpus(corpus)['coverage_98'])
+
+# per level: the coverage you get with vocab_size words, or the words you need for target_perc coverage,
+# along with the share of videos you could understand (98% coverage) with that many words
+def get_vocab_explorer_table(vocab_size=None, target_perc=None, corpus=DEFAULT_CORPUS):
+
+    engine = get_coverage_engine(corpus=corpus)
+    levels = engine['levels']
+
+    if vocab_size is not None:
+        coverages = coverage.coverage_at(engine, vocab_size)
+        shares = coverage.share_of_videos_understood(engine, vocab_size)
+        return pd.DataFrame({
+            'Word coverage (%)': [coverages[level] for level in levels],
+            'Videos you could understand (%)': [100.0 * shares[level] for level in levels],
+        }, index=levels)
+
+    vocab_sizes = coverage.vocab_for_coverage(engine, target_perc)
+    shares = []
+    for level in levels:
+        if vocab_sizes[level] is None:
+            shares.append(None)
+        else:
+            shares.append(100.0 * coverage.share_of_videos_understood(engine, vocab_sizes[level])[level])
+
+    return pd.DataFrame({
+        'Words needed': [vocab_sizes[level] for level in levels],
+        'Videos you could understand (%)': shares,
+    }, index=levels)
+
+# functions for the known-words upload
+def has_word_counts(corpus=DEFAULT_CORPUS):
+
+    return get_corpus(corpus)['word_counts'] is not None
+
+# returns (top ranked videos, number of known words found in the vocabulary, number not found)
+def get_known_words_recommendations(text, corpus=DEFAULT_CORPUS, top=20):
+
+    video_df, _, _ = load_dataframes(corpus)
+    counts = word_counts.load_word_counts(get_corpus(corpus)['word_counts'])
+
+    known_ids, not_found = known_words.to_token_ids(known_words.parse_known_words(text), counts['token_ids'])
+
+    return known_words.recommend(counts, video_df, known_ids, top=top), len(known_ids), not_found
+
+# principal components of every video's standardized metrics, with a k-d tree over them (see projection.py)
+@timed_cache_resource
+def get_projection(corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+
+    return projection.build_projection(video_df, list(METRIC_LABELS))
+
+@timed_cache_data
+def get_projection_map(corpus=DEFAULT_CORPUS):
+
+    levels, colors = get_levels(corpus)
+    video_projection = get_projection(corpus=corpus)
+    variance = video_projection['explained_variance_ratio']
+
+    return alt.Chart(projection.binned_map(video_projection)).mark_circle(
+        cursor='pointer',
+    ).encode(
+        x=alt.X(
+            'pc1:Q',
+            title=f'First principal component ({variance[0]:.0%} of the variance)',
+            axis=alt.Axis(
+                labelFontSize=14,
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        y=alt.Y(
+            'pc2:Q',
+            title=f'Second principal component ({variance[1]:.0%})',
+            axis=alt.Axis(
+                labelFontSize=14,
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+            ),
+        ),
+        size=alt.Size('videos:Q', scale=alt.Scale(range=[40, 400]), legend=None),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                orient='right',
+                direction='vertical',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        tooltip=[
+            alt.Tooltip('level:N', title='Level:'),
+            alt.Tooltip('videos:Q', title='Video count:'),
+        ],
+        opacity=alt.condition(selection, alt.value(0.75), alt.value(0.1)),
+    ).properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text='All the statistics at once',
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    ).add_params(
+        selection
+    ).configure(
+        background='white'
+    )
+
+# the videos closest to a video on the map (over all the principal components kept, not just the two shown)
+def get_similar_videos(video, corpus=DEFAULT_CORPUS, k=5):
+
+    return projection.nearest(get_projection(corpus=corpus), video, k=k)
+
+# standardized metrics of every video, for similar-video recommendations (see recommender.py)
+@timed_cache_resource
+def get_feature_index(corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+
+    return recommender.build_feature_index(video_df, list(METRIC_LABELS))
+
+def get_recommendations(video, metric='cosine', same_level=False, corpus=DEFAULT_CORPUS, k=5):
+
+    index = get_feature_index(corpus=corpus)
+    levels = None
+    if same_level:
+        levels = [index['levels'][index['video_ids'] == video][0]]
+
+    return recommender.similar_videos(index, video, k=k, metric=metric, levels=levels)
+
+# rolling quartiles of every metric over the last videos of each level, in publishing order (see drift.py)
+@timed_cache_data
+def get_drift(corpus=DEFAULT_CORPUS):
+
+    video_df, _, _ = load_dataframes(corpus)
+
+    return drift.build_drift(video_df, list(METRIC_LABELS))
+
+@timed_cache_data
+def get_drift_chart(column, corpus=DEFAULT_CORPUS):
+
+    levels, colors = get_levels(corpus)
+    metric_drift = get_drift(corpus=corpus)
+
+    rows = metric_drift['rows']
+    rows = rows.loc[rows['metric'] == column, ['level', 'video'] + drift.QUANTILE_COLUMNS].dropna()
+
+    base = alt.Chart(rows).encode(
+        x=alt.X(
+            'video:Q',
+            title='Video number',
+            axis=alt.Axis(
+                labelFontSize=14,
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20
+            )
+        ),
+        color=alt.Color(
+            'level:N',
+            scale=alt.Scale(range=colors),
+            sort=levels,
+            legend=alt.Legend(
+                title=get_level_title(corpus),
+                titleFontSize=18,
+                titleFontWeight='bolder',
+                labelFontSize=16,
+                symbolType='circle',
+                symbolSize=200,
+                orient='right',
+                direction='vertical',
+                padding=10,
+                cornerRadius=5,
+            )
+        ),
+        opacity=alt.condition(selection, alt.value(1.0), alt.value(0.1)),
+    )
+
+    band = base.mark_area(opacity=0.25).encode(
+        y=alt.Y('q25:Q'),
+        y2='q75:Q',
+        opacity=alt.condition(selection, alt.value(0.25), alt.value(0.05)),
+    )
+
+    lines = base.mark_line(strokeWidth=3).encode(
+        y=alt.Y(
+            'median:Q',
+            title=METRIC_LABELS[column],
+            scale=alt.Scale(zero=False),
+            axis=alt.Axis(
+                labelFontSize=14,
+                titleFontSize=18,
+                titleColor='black',
+                titleFontWeight='normal',
+                titlePadding=20,
+            ),
+        ),
+        tooltip=[
+            alt.Tooltip('video:Q', title='Video number:'),
+            alt.Tooltip('median:Q', title='Rolling median:', format='.3~f'),
+            alt.Tooltip('q25:Q', title='25th percentile:', format='.3~f'),
+            alt.Tooltip('q75:Q', title='75th percentile:', format='.3~f'),
+            alt.Tooltip('level:N', title='Level:'),
+        ],
+    ).add_params(
+        selection
+    )
+
+    return alt.layer(band, lines, background='white').properties(
+        width='container',
+        height=500,
+        title=alt.TitleParams(
+            text=f'{METRIC_LABELS[column]} over the last {metric_drift["size"]} videos of each level',
+            offset=20,
+            fontSize=24,
+            fontWeight='normal',
+            anchor='middle',
+            color='black',
+            subtitleFontSize=15,
+            subtitleColor='gray'
+        )
+    )
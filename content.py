@@ -0,0 +1,235 @@
+import charts
+
+# The sections of the analysis, in page order, shared by the app (app.py) and the static export (report.py)
+# so the two can't drift apart. Each section is a (name, blocks) pair, the name being what the timings are
+# recorded under, and each block one of:
+#   ('markdown', text)
+#   ('chart', name, builder, kwargs)    an altair chart; kwargs is the variant the report shows, the app
+#   ('table', name, builder, kwargs)    lets readers pick theirs (see CHART_CONTROLS in app.py)
+#   ('image', name, builder, kwargs)
+#   ('list', name, items)               a numbered list
+#   ('app', name)                       an interactive widget, only in the app
+SECTIONS = [
+    ('intro', [
+        ('markdown', "Note: this analysis is meant to viewed on a computer and not a phone (sorry!)"),
+        ('markdown', "[Code and data can be found [here](https://github.com/joshdavham/cij-analysis)]"),
+        ('markdown', "# What makes comprehensible input *comprehensible*?"),
+        ('markdown', "**Comprehensible input** (or CI, for short) is a language learning method where teachers provide their students with lots of language “input” that has been adapted to a level that they can understand. It is believed by many that CI is one of the most natural and effective ways to acquire a foreign language."),
+        ('markdown', "…but what exactly is it about comprehensible input that makes it so *comprehensible*?"),
+        ('markdown', "To answer this question, we'll be analyzing the videos on \
+            [cijapanese.com](https://cijapanese.com/) (CIJ), a \
+            CI platform for learning Japanese."),
+    ]),
+    ('rate of speech', [
+        ('markdown', "## How fast is CI?"),
+        ('markdown', "If we measure how fast the teachers speak on CIJ, we find that \
+            they speak more slowly in videos meant for beginners and more quickly \
+            in videos meant for advanced learners."),
+        ('markdown', "**(THESE GRAPHS ARE CLICKABLE)**"),
+        ('chart', 'wpm_chart', charts.get_wpm_chart, {'show_medians': True}),
+        ('markdown', "To put the above data into perspective, native Japanese speakers \
+            can speak at rates of over 200 wpm, meaning that most of the videos \
+            on CIJ have been adapted to be a lot slower than that!"),
+        ('markdown', "We can also measure the rate of speech in syllables per second (SPS) \
+            and compare it to words per minute."),
+        ('chart', 'wpm_vs_sps_chart', charts.get_wpm_vs_sps_chart, {'interactive': False}),
+        ('app', 'video_drill_down'),
+    ]),
+    ('statistics lesson', [
+        ('markdown', "## A quick statistics lesson"),
+        ('markdown', "Before we continue the analysis, there's some basic things you should know."),
+        ('markdown', "### The data"),
+        ('markdown', "The dataset we'll be analyzing comprises of just under 1,000 videos. \
+            In particular, we'll be analyzing the subtitles of the videos."),
+        ('markdown', 'Also, every video has a level: **Complete Beginner**, **Beginner**, \
+            **Intermediate**, or **Advanced**.'),
+        ('markdown', "### The statistics"),
+        ('markdown', "The goal of this analysis is to find features in the video data that lead \
+            to a specific pattern called an \"ordering\"."),
+        ('markdown', "We're specifically looking for *any* statistic that can lead to an \
+            ordering of the levels in either of the two following directions:"),
+        ('markdown', "> Complete Beginner < Beginner < Intermediate < Advanced"),
+        ('markdown', "or"),
+        ('markdown', "> Complete Beginner > Beginner > Intermediate > Advanced"),
+        ('markdown', "For example: if a statistic is small for Complete Beginnner videos, but gets bigger \
+            for Beginner, Intermediate, then Advanced videos, it suggests \
+            that this is a good statistic for determining what makes a video comprehensible. \
+            In fact, we already saw this above when measuring the [words per minute statistic](#how-fast-is-ci)."),
+        ('markdown', "### How sure can we be?"),
+        ('app', 'bootstrap_medians'),
+        ('markdown', "Medians don't tell the whole story either: two levels can have different medians and still have \
+            lots of videos in common. Under every histogram, **Cliff's delta** (δ) says how often a video \
+            of the harder level has a bigger value than one of the easier level, minus how often it's smaller \
+            (0 means the levels are interchangeable, ±1 means they don't overlap at all), and the **overlap** is \
+            the area the two histograms share."),
+        ('table', 'effect_sizes', charts.get_effect_size_table, {}),
+        ('markdown', "Okay! Now we can continue."),
+    ]),
+    ('sentence length', [
+        ('markdown', "## Sentence length"),
+        ('markdown', "Videos meant for beginners tend to have shorter sentences on average."),
+        ('chart', 'sentence_length_hist', charts.get_sentence_length_hist, {'show_medians': True}),
+        ('markdown', "This makes sense because long sentences can be more complex and packed with information \
+            whereas short sentences are usually simpler."),
+    ]),
+    ('amount of repetition', [
+        ('markdown', "## Amount of repetition"),
+        ('markdown', "Words are repeated more often in easier videos."),
+        ('chart', 'repetition_hist', charts.get_repetition_hist, {'show_medians': True}),
+        ('markdown', "If you don't catch a word the first time it's said, there's more opportunities \
+            in the easier videos to hear that word repeated again."),
+    ]),
+    ('how many words', [
+        ('markdown', "## How many words you need to know"),
+        ('markdown', "A popular statistic in language learning circles is that you generally \
+            need to know around 98% of the words in a given piece of content in order to be able to understand it well. \
+            This statistic is known as 'word coverage' - the percentage of words you know in a given text."),
+        ('markdown', "How many words do you need to know in order to understand 98% of the words in each level?"),
+        ('markdown', "If we take all of the words from each of the CIJ videos, count them and then order them from most common to least common, \
+             we can calculate the word coverage you get at different vocabulary sizes. \
+            For example, if we learn the top 500 words from CIJ, then we'll know around 80% of the words in the \
+            Complete Beginner videos. And if we learn the top 4,295 words, then we'll know 98% of the words in the Complete Beginner videos."),
+        ('chart', 'word_coverage_chart', charts.get_word_coverage_chart, {'zoom': False}),
+        ('markdown', "Using this same method of calculating word coverage, \
+            we can also calculate how many of the top words from CIJ you need to know \
+            in order to achieve 98% word coverage in each video."),
+        ('chart', 'ne_spot_hist', charts.get_ne_spot_hist, {'show_medians': True}),
+        ('markdown', "In general, easier videos require smaller vocabulary sizes to understand."),
+        ('app', 'vocab_explorer'),
+        ('app', 'known_words'),
+    ]),
+    ('word rareness', [
+        ('markdown', "## Word rareness"),
+        ('markdown', "Harder videos use rarer words."),
+        # tfplr stands for "twenty fifth percentile log rank"
+        ('chart', 'tfplr_hist', charts.get_tfplr_hist, {'show_medians': True}),
+        ('markdown', "How common a word is, is known as its 'rank'. The most common word \
+            in a text would be rank 1 and the fifth most common would be rank 5. \
+            A word with a low rank is a commonly used word (e.g., 'and', 'work', 'that') whereas a word with a high rank \
+            is an uncommon or 'rare' word (e.g., 'esoteric', 'gauche', 'opprobrium'). Furthermore, \
+            a list of word ranks is known as a 'frequency list'."),
+        ('markdown', "The ranks of the words in the videos were compared with a larger, independent frequency list and then scaled with a log function \
+            before computing the twenty fifth percentile. This was done to make for a better visualization."),
+        ('markdown', "Note: it's okay if the above values don't quite make sense to you - just know that the graph \
+            demonstrates that easier videos tend to use common words more often whereas \
+            advanced videos tend to use rarer words more often."),
+    ]),
+    ('grammar', [
+        ('markdown', "## Grammar"),
+        ('markdown', "Easier videos use less [subordinating conjunctions](https://universaldependencies.org/ja/pos/SCONJ.html) than harder videos."),
+        ('chart', 'sconj_hist', charts.get_sconj_hist, {'show_medians': True}),
+        ('markdown', "We also notice differences in the use of other types of words."),
+        ('table', 'grammar_table', charts.get_grammar_table, {}),
+    ]),
+    ('word origin', [
+        ('markdown', "## Word origin"),
+        ('markdown', "There are three main categories of words in Japanese:"),
+        ('markdown', "(1) Wago (和語), (2) Kango (漢語) and (3) Gairaigo (外来語)"),
+        ('markdown', "Wago are native Japanese words, Kango are Chinese words and Gairaigo are foreign words."),
+        ('markdown', "Harder videos use more kango than easier videos"),
+        ('chart', 'kango_hist', charts.get_kango_hist, {'show_medians': True}),
+        ('markdown', "In Japanese, kango are somewhat analogous to French words in English. \
+            These words tend to be more technical or sophisticated than other words."),
+        ('markdown', "We also notice orderings when counting the percentage of Wago and Gairaigo as well."),
+        ('table', 'word_origin_table', charts.get_word_origin_table, {}),
+    ]),
+    ('most important factors', [
+        ('markdown', "## Which factors matter the most?"),
+        ('markdown', "We've just found a number of statistics that lead to orderings in the data, \
+            but which statistics matter the most?"),
+        ('markdown', "To answer this, we can look at a correlation heatmap between each of the variables \
+            and observe which statistics correlate the most strongly with the video's level. \
+            In particular, we'll want to look at the first row (or first column) of the heatmap."),
+        ('app', 'refresh_note'),
+        ('image', 'vanilla_heatmap', charts.render_vanilla_heatmap, {}),
+        ('markdown', "In case you're not familiar with stuff like this, numbers close to 1 or -1 \
+            represent a high level or correlation while numbers close to 0 represent a low level of correlation. \
+            Positive numbers represent a positive relationship between the variables and negative numbers represent a \
+            reverse relationship between the variables."),
+        ('markdown', "If we use a statistics rule of thumb and remove all of the variables that have correlations \
+            weaker than 0.3 (and more than -0.3), we can identify the variables with the strongest correlations."),
+        # the app shows one of these two at a time
+        ('image', 'level_row_unordered', charts.render_level_row_unordered, {}),
+        ('image', 'level_col_ordered', charts.render_level_col_ordered, {}),
+        ('markdown', "To summarize (and simplify), the factors that correlate the most with the difficulty level are:"),
+        ('list', 'most_important_factors', charts.MOST_IMPORTANT_FACTORS),
+        ('markdown', "In other words, as the videos get harder, the speech gets faster, the sentences get longer, words are repeated *less* \
+            and so on and so forth!"),
+        ('markdown', "### All the statistics at once"),
+        ('markdown', "Instead of one statistic at a time, we can also place every video on a map by all of its statistics \
+            at once. Principal component analysis finds the two directions along which the videos differ the most, \
+            and the closer two videos are on the map, the more alike their statistics are overall."),
+        ('chart', 'projection_map', charts.get_projection_map, {}),
+        ('app', 'map_video'),
+    ]),
+    ('over time', [
+        ('markdown', "## Has CI changed over time?"),
+        ('markdown', "Videos are numbered in the order they were published, so we can also check whether the videos \
+            of each level have changed as the catalogue grew. The lines below are the medians of the last \
+            videos of each level at every point, with the middle half of those videos shaded around them."),
+        ('chart', 'drift_chart', charts.get_drift_chart, {'column': 'wpm'}),
+    ]),
+    ('conclusion', [
+        ('markdown', "## Dicussion / Conclusion"),
+        ('markdown', "I find comprehensible input absolutely fascinating. The fact that\
+            at any stage of the language acquisition process, the language can\
+            be made into a form that anyone can understand, even without formal instruction."),
+        ('markdown', "In the above analysis, we saw that there exist a number of patterns that help \
+            explain what CI is made of and the various factors that change \
+            when CI is targeted at new vs. experienced learners."),
+        ('markdown', "The findings in this analysis are not meant to be conclusive or to tell CI educators\
+            how to teach their students, but rather just to get us thinking more analytically about the factors\
+            that help or hurt comprehensibility. Most of us know intuitively that slow speech is easier to understand than fast\
+            speech, but how many of us think about the importance of repetition when trying to make ourselves understood? \
+            I think it's interesting and important to think about these things as both language learners and educators."),
+        ('markdown', "## Thanks for reading ✌️"),
+        ('markdown', "Thanks also to Ben, Russ Simmons and Yuki Kimura for looking at early drafts of this analysis."),
+        ('markdown', "If you're a Japanese learner and you're interested in learning Japanese the natural way, then I'd highly recommend getting a membership \
+            at [cijapanese.com](https://cijapanese.com). You'll get access to nearly 1,000 videos with new videos being added each week!"),
+        ('markdown', "---"),
+        ('markdown', "#### Further discussion for hardcore nerds"),
+        ('markdown', "- No tests of statistical significance were conducted. This was purely meant as an EDA. \
+            However, you can get the data from the repo linked at the top and conduct tests yourself if you'd like. \
+            I'd recommend starting with non-parametric tests like Kruskal-Wallis and moving on to pairwise tests \
+            with a bonferonni correction if there's a significant result. Parametric tests may also be interesting."),
+        ('markdown', "- For those interested in modelling difficulty/proficiency level, I'd recommend checking out the [jreadability python package](https://github.com/joshdavham/jreadability) \
+            then following the links. The model is very simple but should serve as a useful starting point for those interested in building their own models."),
+        ('markdown', "- While CIJ classifies their videos into discrete proficiency levels, it should be noted that language proficiency \
+            is likely better modelled as a continuous variable. Evidence of this is partly observed by the amount of statistical overlap between \
+            the videos of the various level groups."),
+        ('markdown', "- Technically, I computed 'moras per second' - not syllables per second. I'm aware that this \
+            is technically linguistically incorrect, but it still serves as a close approximation and is easier \
+            to understand for readers unfamiliar with Japanese linguistics."),
+        ('markdown', "- The Mecab and Sudachi parsers (through Fugashi and Spacy) were used to analyze the transcripts. These parsers are not always 100% accurate."),
+        ('markdown', "- When computing the statistics for repetition, word coverage and word frequency, lemmas were used rather than tokens."),
+        ('markdown', "- Of the parsed words, while I did remove punctuation, I didn't otherwise verify that each token was an actual word. \
+            There is likely some amount of noise in the data such as mis-parses, etc."),
+        ('markdown', "- I am slightly abusing the 98% statistic in this analysis. The original research applies \
+            mainly to written text whereas the content on CIJ is mainly meant to listened to rather than read."),
+        ('markdown', "- If you're like me, the word coverage plots also probably evoked a resemblance to Heap's Law. \
+            More research would need to be done, but I suspect one may be able to find a link between word coverage and Heap's Law."),
+        ('markdown', "- The frequency list used to calculate the word ranks was created from over 4,000 Japanese TV episodes and movies on Netflix. \
+            Furthemore, the 25th percentile was computed on the ranks of unique words in each video's subtitles. Getting a decent visualization for \
+            something like this is actually a bit tricky due to the highly exponential nature of word-frequency distributions which are power laws."),
+        ('markdown', "- One should bare in mind that the learner levels were labelled by a small group of experts and not a large number of learners. \
+            In other words, the difficulty levels are not objective, but rather an approximation of difficulty / natural acquistion order."),
+        ('markdown', "- There were a number of statistics I also tried but didn't get orderings from:"),
+        ('markdown', "1. **Audibility** - My hypothesis was that the teachers would speak more clearly in easy videos and less clearly in harder videos. \
+            To test this, I generated whisper transcripts for each video's audio file, converted both the whisper transcript \
+            and the original transcript to katakana and compared the character error rate. I found no differences in the levels. \
+            Furthermore I can't tell if this moreso invalidates my original hypothesis or if whisper is just that good."),
+        ('markdown', "2. **Word length** - At least in English and French (the languages I know best), longer words are generally considered harder. \
+            My hypothesis was that the easier videos would use shorter words while the harder videos would use bigger words. \
+            To test this, I parsed the transcripts and converted all words to katakana \
+            to get a measure of how long the words were orally. I found no differences between the levels."),
+        ('markdown', "3. **Range of vocabulary** - I suspected that easier videos may limit themselves to a smaller range of vocabulary than harder videos. \
+            To measure this, I calculated unique word occurences / total word occurences but I found no ordering in the levels."),
+        ('markdown', "4. **Other parts of speech** - I did test for orderings between the levels for other parts of speech such as: \
+            proportion of adjectives, adpositions, coordinating conjunctions, interjections, particles and proper nouns \
+            but ultimately didn't find any obvious orderings."),
+        ('markdown', "5. **Other word frequency metrics** - You can probably guess from reading '25th percentile log rank', that this was not the first statistic I tried.\
+            I also tried computing the un-logged ranks, the mean, median, 75th percentile and non-unique (repeated) word ranks from the videos, and while some of these led to\
+            orderings, they were generally not very nice to visualize. I'm certain that there's got to be a nicer statistic for representing how rare the overall vocabulary in a text is. \
+            But Zipf's law makes this a challenge."),
+    ]),
+]
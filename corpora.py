@@ -0,0 +1,59 @@
+import pandas as pd
+
+# Every corpus has its own tables (same columns as the cijapanese.com ones) and its own level taxonomy,
+# listed from easiest to hardest with one chart color per level. Nothing is read until a corpus is used.
+CORPORA = {}
+
+DEFAULT_CORPUS = 'cij'
+
+def register_corpus(name, title, video_data, word_coverage, num_video, levels, colors, coverage_98=None, word_counts=None,
+                    level_title='Level'):
+
+    if len(colors) != len(levels):
+        raise ValueError(f"Corpus '{name}' has {len(levels)} levels but {len(colors)} colors")
+
+    CORPORA[name] = {
+        'title': title,
+        'video_data': video_data,
+        'word_coverage': word_coverage,
+        'num_video': num_video,
+        'levels': list(levels),
+        'colors': list(colors),
+        # vocab size needed for 98% coverage per level, when the shipped coverage curve is too coarse to compute it
+        'coverage_98': coverage_98,
+        # directory with the per-video word counts (see word_counts.py), needed for the known-words upload
+        'word_counts': word_counts,
+        # title of the level legend of the charts
+        'level_title': level_title,
+    }
+
+def get_corpus(name):
+
+    if name not in CORPORA:
+        raise KeyError(f"Unknown corpus '{name}'. Registered corpora: {', '.join(CORPORA)}")
+
+    return CORPORA[name]
+
+def read_tables(name):
+
+    corpus = get_corpus(name)
+
+    # memory maps the files while parsing instead of reading them into a buffer first
+    video_df = pd.read_csv(corpus['video_data'], sep='\t', memory_map=True)
+    word_coverage_df = pd.read_csv(corpus['word_coverage'], sep='\t', memory_map=True)
+    num_video_df = pd.read_csv(corpus['num_video'], sep='\t', memory_map=True)
+
+    return video_df, word_coverage_df, num_video_df
+
+register_corpus(
+    'cij',
+    title='cijapanese.com',
+    video_data='video_data.tsv',
+    word_coverage='word_coverage_df_plot.tsv',
+    num_video='num_video_df.tsv',
+    levels=['Complete Beginner', 'Beginner', 'Intermediate', 'Advanced'],
+    colors=['#a5bee4', '#9ad6d8', '#c7aecd', '#dd9e9e'],
+    # word_coverage_df_plot.tsv only keeps every 13th rank, so these come from the full curves
+    coverage_98={'Complete Beginner': 4295, 'Beginner': 5606, 'Intermediate': 6853, 'Advanced': 9085},
+    level_title='CIJ Level',
+)
@@ -0,0 +1,127 @@
+import numpy as np
+
+# The coverage curves (word_coverage_df) give, for every level, the % of words understood when knowing the
+# top N CIJ words. They only grow with N, so both directions of the question are binary searches over
+# the curve, and ne_spot (the vocab size each video needs for 98% coverage) sorted per level turns
+# "how many videos can I understand" into one as well.
+#
+# coverage_98 ({level: vocab size}, optional) are the exact sizes for 98% coverage from the full curves,
+# returned as is for a 98% target so the explorer agrees with the coverage chart.
+def build_engine(video_df, word_coverage_df, levels, coverage_98=None):
+
+    engine = {'levels': list(levels), 'curves': {}, 'ne_spot': {}, 'coverage_98': coverage_98}
+
+    for level in levels:
+        curve = word_coverage_df.loc[word_coverage_df['level'] == level].sort_values('rank')
+        engine['curves'][level] = (
+            curve['rank'].to_numpy(dtype=np.int64),
+            # running max, in case of float noise at the tail of the curve
+            np.maximum.accumulate(curve['coverage_perc'].to_numpy(dtype=np.float64))
+        )
+        engine['ne_spot'][level] = np.sort(video_df.loc[video_df['level'] == level, 'ne_spot'].to_numpy(dtype=np.int64))
+
+    return engine
+
+# % of words understood in each level when knowing the top vocab_size words
+def coverage_at(engine, vocab_size):
+
+    # the curves are sampled, so interpolate between the two closest ranks (np.interp is a binary search)
+    return {level: float(np.interp(vocab_size, ranks, coverage, left=0.0)) for level, (ranks, coverage) in engine['curves'].items()}
+
+# smallest vocab size that reaches target_perc coverage in each level (None if the curve never gets there),
+# interpolated between the two closest ranks like coverage_at, so the two directions agree
+def vocab_for_coverage(engine, target_perc):
+
+    if target_perc == 98 and engine['coverage_98'] is not None:
+        return {level: int(engine['coverage_98'][level]) for level in engine['levels']}
+
+    vocab_sizes = {}
+    for level, (ranks, coverage) in engine['curves'].items():
+        i = np.searchsorted(coverage, target_perc, side='left')
+        if i == len(ranks):
+            vocab_sizes[level] = None
+        elif i == 0:
+            vocab_sizes[level] = int(ranks[0])
+        else:
+            # coverage[i - 1] < target_perc <= coverage[i]
+            share = (target_perc - coverage[i - 1]) / (coverage[i] - coverage[i - 1])
+            vocab_sizes[level] = int(np.ceil(ranks[i - 1] + share * (ranks[i] - ranks[i - 1])))
+
+    return vocab_sizes
+
+# share of each level's videos that need at most vocab_size words for 98% coverage
+def share_of_videos_understood(engine, vocab_size):
+
+    shares = {}
+    for level, ne_spot in engine['ne_spot'].items():
+        understood = np.searchsorted(ne_spot, vocab_size, side='right')
+        shares[level] = understood / len(ne_spot) if len(ne_spot) else 0.0
+
+    return shares
+
+###
+# PER-VIDEO COVERAGE MATRIX
+###
+
+# Known-word counts at which every video's coverage is stored: log-spaced, since the coverage curves
+# change fast over the first few hundred words and very slowly after a few thousand.
+CHECKPOINTS = np.unique(np.geomspace(1, 50000, 64).round().astype(np.int64))
+
+# Builds a (videos x checkpoints) float16 matrix with the share of each video's tokens covered by the
+# top CHECKPOINTS[j] words (~120 bytes per video, so ~12 MB at 100k videos).
+#
+# The word counts come in CSR form: the words of video i are ranks[indptr[i]:indptr[i + 1]] (the
+# 1-based frequency rank of each word in the corpus) and counts[indptr[i]:indptr[i + 1]] (how many
+# times the video uses it).
+def build_coverage_matrix(indptr, ranks, counts, checkpoints=CHECKPOINTS):
+
+    indptr = np.asarray(indptr, dtype=np.int64)
+    ranks = np.asarray(ranks, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+
+    n_videos = len(indptr) - 1
+    rows = np.repeat(np.arange(n_videos), np.diff(indptr))
+    totals = np.bincount(rows, weights=counts, minlength=n_videos)
+    totals[totals == 0] = 1.0
+
+    # one pass over the words: count each video's tokens per checkpoint bucket (the first checkpoint
+    # that covers the word; words past the last checkpoint go in an extra bucket), then accumulate
+    n_buckets = len(checkpoints) + 1
+    buckets = np.searchsorted(checkpoints, ranks, side='left')
+    covered = np.bincount(rows * n_buckets + buckets, weights=counts, minlength=n_videos * n_buckets)
+    covered = np.cumsum(covered.reshape(n_videos, n_buckets)[:, :-1], axis=1)
+
+    return (covered / totals[:, None]).astype(np.float16)
+
+# coverage of every video (as a share, 0 to 1) when knowing the top vocab_size words,
+# interpolated between the two closest checkpoints on a log scale
+def video_coverages(matrix, vocab_size, checkpoints=CHECKPOINTS):
+
+    if vocab_size < checkpoints[0]:
+        return np.zeros(len(matrix), dtype=np.float32)
+    if vocab_size >= checkpoints[-1]:
+        return matrix[:, -1].astype(np.float32)
+
+    j = int(np.searchsorted(checkpoints, vocab_size, side='right')) - 1
+    weight = np.log(vocab_size / checkpoints[j]) / np.log(checkpoints[j + 1] / checkpoints[j])
+
+    # only two columns are read, whatever the number of videos
+    low = matrix[:, j].astype(np.float32)
+    high = matrix[:, j + 1].astype(np.float32)
+    return low + np.float32(weight) * (high - low)
+
+# positions (rows of the matrix) of the videos with at least min_coverage_perc % coverage
+# when knowing the top vocab_size words
+def videos_understood(matrix, vocab_size, min_coverage_perc=98.0, checkpoints=CHECKPOINTS):
+
+    return np.flatnonzero(video_coverages(matrix, vocab_size, checkpoints) >= min_coverage_perc / 100.0)
+
+def save_coverage_matrix(path, matrix, video_ids, checkpoints=CHECKPOINTS):
+
+    np.savez(path, matrix=matrix, video_ids=np.asarray(video_ids), checkpoints=np.asarray(checkpoints))
+
+# returns (matrix, video_ids, checkpoints)
+def load_coverage_matrix(path):
+
+    with np.load(path) as f:
+        return f['matrix'], f['video_ids'], f['checkpoints']
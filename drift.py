@@ -0,0 +1,143 @@
+import argparse
+import bisect
+import collections
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# How the statistics of each level drift as the catalogue grows. Video numbers follow the publishing order,
+# so the rolling quantiles of a metric over the last window videos of a level (in video order) show whether
+# e.g. Beginner videos have been getting faster over time.
+#
+# A rolling window is kept as its values in arrival order plus the same values sorted: a new value is
+# inserted into the sorted list with a binary search and the oldest one is removed the same way, so every
+# quantile is an index into the sorted list. The windows are kept in the drift state, so newly published
+# videos only extend the series instead of recomputing it from the first video.
+#
+#   drift = build_drift(video_df, ['wpm', 'ne_spot'])
+#   drift = append_videos(drift, new_video_df)    only rolls over the videos past the last one seen
+#   drift['rows']                                  one row per (metric, level, video)
+
+DEFAULT_WINDOW = 25
+QUANTILES = (0.25, 0.5, 0.75)
+QUANTILE_COLUMNS = ['q25', 'median', 'q75']
+
+def new_window(size):
+
+    return {'size': size, 'values': collections.deque(), 'sorted': []}
+
+# linearly interpolated q-th quantile (0 to 1) of a sorted list, as pandas and numpy
+def window_quantile(sorted_values, q):
+
+    position = q * (len(sorted_values) - 1)
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+
+    return sorted_values[low] + (position - low) * (sorted_values[high] - sorted_values[low])
+
+# pushes values into the window one at a time and returns the quantiles after each of them, as a
+# (len(values), len(quantiles)) array (NaN until the window is full). Missing values are skipped.
+def roll(window, values, quantiles=QUANTILES):
+
+    results = np.full((len(values), len(quantiles)), np.nan)
+
+    for i, value in enumerate(values):
+        if value != value:
+            continue
+
+        window['values'].append(value)
+        bisect.insort(window['sorted'], value)
+        if len(window['values']) > window['size']:
+            oldest = window['values'].popleft()
+            del window['sorted'][bisect.bisect_left(window['sorted'], oldest)]
+
+        if len(window['values']) == window['size']:
+            results[i] = [window_quantile(window['sorted'], q) for q in quantiles]
+
+    return results
+
+def rolling_quantiles(values, size=DEFAULT_WINDOW, quantiles=QUANTILES):
+
+    return roll(new_window(size), values, quantiles)
+
+# rolls every (metric, level) window over the videos of video_df, in video order
+def roll_videos(drift, video_df):
+
+    video_df = video_df.sort_values('video', kind='stable')
+    rows = []
+
+    for level, level_df in video_df.groupby('level', sort=False):
+        for metric in drift['metrics']:
+            window = drift['windows'].setdefault((metric, level), new_window(drift['size']))
+            quantiles = roll(window, level_df[metric].to_numpy(dtype=np.float64))
+            rows.append(pd.DataFrame({
+                'metric': metric,
+                'level': level,
+                'video': level_df['video'].to_numpy(),
+                **{column: quantiles[:, i] for i, column in enumerate(QUANTILE_COLUMNS)},
+            }))
+
+    if rows:
+        new_rows = pd.concat(rows, ignore_index=True)
+        drift['rows'] = pd.concat([drift['rows'], new_rows], ignore_index=True) if len(drift['rows']) else new_rows
+        drift['last_video'] = max(drift['last_video'], int(video_df['video'].max()))
+
+    return drift
+
+def build_drift(video_df, metrics, size=DEFAULT_WINDOW):
+
+    drift = {
+        'metrics': list(metrics),
+        'size': size,
+        'windows': {},
+        'rows': pd.DataFrame(columns=['metric', 'level', 'video'] + QUANTILE_COLUMNS),
+        'last_video': -1,
+    }
+
+    return roll_videos(drift, video_df)
+
+# extends the series with the videos of video_df published after the last one already rolled
+def append_videos(drift, video_df):
+
+    return roll_videos(drift, video_df[video_df['video'] > drift['last_video']])
+
+def save_drift(path, drift):
+
+    with open(path, 'wb') as f:
+        pickle.dump(drift, f)
+
+def load_drift(path):
+
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# Usage:
+#   python drift.py video_data.tsv [--out drift.pkl] [--window 25] [--metrics wpm ne_spot ...]
+#
+# If --out already exists, only the videos published since it was written are rolled into it.
+# Writes the series next to it as a tsv (one row per metric, level and video).
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Rolling per-level quantiles of the metrics by video number.')
+    parser.add_argument('path', help='video_data.tsv')
+    parser.add_argument('--out', default='drift.pkl')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--metrics', nargs='+')
+    args = parser.parse_args()
+
+    video_df = pd.read_csv(args.path, sep='\t')
+
+    if os.path.exists(args.out):
+        drift = load_drift(args.out)
+        new_videos = int((video_df['video'] > drift['last_video']).sum())
+        drift = append_videos(drift, video_df)
+        print(f"Rolled {new_videos} new videos into {args.out}")
+    else:
+        metrics = args.metrics or [column for column in video_df.columns if column not in ('video', 'level')]
+        drift = build_drift(video_df, metrics, args.window)
+        print(f"Rolled {len(video_df)} videos into {args.out}")
+
+    save_drift(args.out, drift)
+    drift['rows'].to_csv(os.path.splitext(args.out)[0] + '.tsv', sep='\t', index=False)
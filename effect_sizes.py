@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# How far apart the distributions of a metric are in two levels, beyond their medians:
+#   cliffs_delta   P(b > a) - P(b < a) for a video a of the first level and b of the second (-1 to 1, 0 if they're
+#                  interchangeable), from the ranks of one level's values among the other's
+#   ks             the largest gap between the two empirical CDFs (0 to 1)
+#   overlap        the area shared by the two histograms (0 to 1, 1 if they're identical)
+#
+# Each level's values are already sorted in the partitions (see partitions.py), so every statistic is a few
+# binary searches over sorted arrays rather than a comparison of every pair of videos.
+
+# the values of one level, sorted and without NaNs
+def sorted_level_values(partitions, metric, level):
+
+    start, stop = partitions['bounds'][level]
+    values = partitions['sorted'][metric][start:stop]
+
+    # NaNs sort last
+    return values[:len(values) - int(np.isnan(values).sum())]
+
+def cliffs_delta(a, b):
+
+    if len(a) == 0 or len(b) == 0:
+        return np.nan
+
+    # for every value of b, how many values of a are smaller and how many are larger
+    smaller = np.searchsorted(a, b, side='left')
+    larger = len(a) - np.searchsorted(a, b, side='right')
+
+    return (smaller.sum() - larger.sum()) / (len(a) * len(b))
+
+def ks_statistic(a, b):
+
+    if len(a) == 0 or len(b) == 0:
+        return np.nan
+
+    values = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, values, side='right') / len(a)
+    cdf_b = np.searchsorted(b, values, side='right') / len(b)
+
+    return np.abs(cdf_a - cdf_b).max()
+
+# the overlap of the two histograms, over shared bins spanning both levels (as many as the charts use)
+def overlap_coefficient(a, b, bins=20):
+
+    if len(a) == 0 or len(b) == 0:
+        return np.nan
+
+    low, high = min(a[0], b[0]), max(a[-1], b[-1])
+    if low == high:
+        return 1.0
+    edges = np.linspace(low, high, bins + 1)
+
+    share_a = np.diff(np.searchsorted(a, edges[1:-1], side='left'), prepend=0, append=len(a)) / len(a)
+    share_b = np.diff(np.searchsorted(b, edges[1:-1], side='left'), prepend=0, append=len(b)) / len(b)
+
+    return np.minimum(share_a, share_b).sum()
+
+# every statistic for every metric and every pair of levels (easier level first), one row per pair
+def effect_size_table(partitions, metrics):
+
+    rows = []
+    for metric in metrics:
+        values = {level: sorted_level_values(partitions, metric, level) for level in partitions['levels']}
+        for easier, harder in itertools.combinations(partitions['levels'], 2):
+            a, b = values[easier], values[harder]
+            rows.append({
+                'metric': metric,
+                'easier': easier,
+                'harder': harder,
+                'adjacent': partitions['levels'].index(harder) == partitions['levels'].index(easier) + 1,
+                'cliffs_delta': cliffs_delta(a, b),
+                'ks': ks_statistic(a, b),
+                'overlap': overlap_coefficient(a, b),
+            })
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,251 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+import chart_data
+
+# set CIJ_TIMING_LOG=1 to log one json line with the section timings of every rerun
+LOG_TIMINGS = os.environ.get('CIJ_TIMING_LOG', '') not in ('', '0')
+
+logger = logging.getLogger('cij.timings')
+if LOG_TIMINGS and not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# the timings of the script run on the current thread (streamlit runs each rerun on its own thread)
+_local = threading.local()
+
+# process wide aggregates, shared by every session on this replica
+_lock = threading.Lock()
+_totals = defaultdict(lambda: {'kind': None, 'count': 0, 'seconds': 0.0, 'hits': 0, 'misses': 0, 'bytes': None, 'bytes_total': 0})
+_recent_runs = deque(maxlen=100)
+
+# payload size of each cached result, measured once per cache entry rather than on every rerun
+_payload_bytes = {}
+
+def payload_size(result):
+
+    if isinstance(result, alt.TopLevelMixin):
+        return len(result.to_json().encode('utf-8'))
+    # a chart spec in url mode (see chart_data.py)
+    if isinstance(result, dict) and '$schema' in result:
+        return len(json.dumps(result).encode('utf-8'))
+    if isinstance(result, bytes):
+        return len(result)
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+    if isinstance(result, tuple):
+        sizes = [payload_size(item) for item in result]
+        return None if None in sizes else sum(sizes)
+
+    return None
+
+def record(name, kind, seconds, cache=None, nbytes=None):
+
+    entry = {'name': name, 'kind': kind, 'seconds': seconds, 'cache': cache, 'bytes': nbytes}
+
+    run = getattr(_local, 'run', None)
+    if run is not None:
+        run['entries'].append(entry)
+
+    with _lock:
+        total = _totals[name]
+        total['kind'] = kind
+        total['count'] += 1
+        total['seconds'] += seconds
+        if cache == 'hit':
+            total['hits'] += 1
+        elif cache == 'miss':
+            total['misses'] += 1
+        if nbytes is not None:
+            total['bytes'] = nbytes
+            total['bytes_total'] += nbytes
+
+@contextmanager
+def timed(name, kind, nbytes=None):
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, kind, time.perf_counter() - start, nbytes=nbytes)
+
+# drop-in replacement for @st.cache_data that also records the time of every call,
+# whether it was a cache hit or miss, and the size of what it returned
+def timed_cache_data(func):
+
+    return timed_cache(func, st.cache_data)
+
+# the same for @st.cache_resource, for large read-only structures (indexes, models...): every call returns
+# the one shared object instead of unpickling a copy of it, so callers must never modify what they get
+def timed_cache_resource(func):
+
+    return timed_cache(func, st.cache_resource)
+
+def timed_cache(func, cache):
+
+    name = func.__name__
+
+    # only runs on a cache miss
+    @functools.wraps(func)
+    def compute(*args, **kwargs):
+
+        _local.calls[-1]['miss'] = True
+        result = func(*args, **kwargs)
+
+        # in url mode (see chart_data.py) charts are cached as specs that point to their data
+        if isinstance(result, alt.TopLevelMixin) and chart_data.USE_URLS:
+            result = chart_data.url_spec(result)
+
+        return result
+
+    cached = cache(compute)
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        # streamlit's caches key on the arguments exactly as they were passed, so f(), f(x=1) and f(1) would
+        # each get their own cache entry. Passing every argument by name, in order, makes them all share one
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+
+        if not hasattr(_local, 'calls'):
+            _local.calls = []
+
+        call = {'miss': False}
+        _local.calls.append(call)
+        start = time.perf_counter()
+        try:
+            result = cached(**arguments)
+        finally:
+            _local.calls.pop()
+        seconds = time.perf_counter() - start
+
+        key = (name, tuple(arguments.items()))
+        if key not in _payload_bytes:
+            _payload_bytes[key] = payload_size(result)
+
+        record(name, 'build', seconds, cache='miss' if call['miss'] else 'hit', nbytes=_payload_bytes[key])
+
+        return result
+
+    wrapper.clear = cached.clear
+
+    return wrapper
+
+# call at the top of the script; every page section runs until the next mark_section() call
+def start_run():
+
+    _local.run = {'started': time.time(), 'start': time.perf_counter(), 'entries': [], 'section': None}
+
+def mark_section(name):
+
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return
+
+    end_section(run)
+    run['section'] = (name, time.perf_counter())
+
+def end_section(run):
+
+    if run['section'] is not None:
+        name, start = run['section']
+        record(name, 'section', time.perf_counter() - start)
+        run['section'] = None
+
+# call at the end of the script
+def finish_run():
+
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return
+
+    end_section(run)
+    run['seconds'] = time.perf_counter() - run['start']
+    record('script run', 'run', run['seconds'])
+
+    with _lock:
+        _recent_runs.append(run)
+
+    if LOG_TIMINGS:
+        logger.info(json.dumps({
+            'event': 'rerun',
+            'started': run['started'],
+            'seconds': round(run['seconds'], 6),
+            'entries': run['entries']
+        }))
+
+    _local.run = None
+
+    return run
+
+# process wide totals, used by the debug overlay and the metrics endpoint
+def snapshot():
+
+    with _lock:
+        return {name: dict(total) for name, total in _totals.items()}
+
+# rendering helpers for the page, timed under the given name
+def altair_chart(name, chart):
+
+    with timed(name, 'render'):
+        if isinstance(chart, dict):
+            st.vega_lite_chart(chart, use_container_width=True)
+        else:
+            st.altair_chart(chart, use_container_width=True)
+
+def styled_table(name, styled_df):
+
+    with timed(name, 'render'):
+        st.markdown(
+            '<div class="dataframe-div">' + styled_df.to_html() + "</div>"
+            , unsafe_allow_html=True)
+
+def image(name, png):
+
+    with timed(name, 'render', nbytes=len(png)):
+        st.image(png, use_column_width=True)
+
+# shows the timings of the current run (and the process wide totals) in the sidebar
+# when the page is opened with ?debug=1
+def render_overlay(run):
+
+    if st.query_params.get('debug') in (None, '', '0'):
+        return
+
+    entries = pd.DataFrame(run['entries'], columns=['name', 'kind', 'seconds', 'cache', 'bytes'])
+    entries['ms'] = 1000.0 * entries['seconds']
+
+    totals = pd.DataFrame.from_dict(snapshot(), orient='index')
+    totals['mean_ms'] = 1000.0 * totals['seconds'] / totals['count']
+    totals = totals.drop(columns='bytes_total')
+
+    with st.sidebar:
+        st.markdown("### Timings")
+        st.markdown(f"This run: **{1000.0 * run['seconds']:.1f} ms**")
+        st.dataframe(
+            entries.drop(columns='seconds').sort_values('ms', ascending=False),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.markdown("### Totals (this replica)")
+        st.dataframe(
+            totals.drop(columns='seconds').sort_values('mean_ms', ascending=False),
+            use_container_width=True
+        )
@@ -0,0 +1,235 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from corpora import get_corpus, read_tables
+
+# Long analyses run in a small process pool, outside of the script runs, so a slow job from one reader
+# never holds up the reruns of the others. Every job is a row in a local sqlite database: the app submits
+# a job, then polls its status and progress, and the result is stored with it once it's done. Submitting
+# the same job again returns the existing one, so a finished result is reused instead of recomputed.
+JOBS_DB = os.environ.get('CIJ_JOBS_DB', 'jobs.sqlite3')
+JOB_WORKERS = int(os.environ.get('CIJ_JOB_WORKERS', '2'))
+
+# kind -> function(progress, **params); progress(fraction) reports how far along the job is
+JOB_KINDS = {}
+
+_executor = None
+_executor_lock = threading.Lock()
+# database paths whose schema this process has already created
+_schemas = set()
+_schema_lock = threading.Lock()
+
+def job_kind(name):
+
+    def register(func):
+        JOB_KINDS[name] = func
+        return func
+
+    return register
+
+def create_schema(path):
+
+    with contextlib.closing(sqlite3.connect(path, timeout=30)) as connection, connection:
+        # lets the workers write progress while the app reads
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                result BLOB,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+            """
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key)')
+
+def connect(path=None):
+
+    path = path or JOBS_DB
+    # the schema is only created by the first connection of each process
+    with _schema_lock:
+        if path not in _schemas:
+            create_schema(path)
+            _schemas.add(path)
+
+    connection = sqlite3.connect(path, timeout=30)
+    connection.row_factory = sqlite3.Row
+
+    return connection
+
+# one transaction on a new connection, which is closed afterwards
+# (sqlite3's own context manager only commits or rolls back, it doesn't close)
+@contextlib.contextmanager
+def transaction(path=None):
+
+    with contextlib.closing(connect(path)) as connection, connection:
+        yield connection
+
+# Jobs read the corpus files, so a result is only reused while the files are unchanged: the key of a job
+# includes the modification times and sizes of the files of its corpus.
+def data_version(corpus):
+
+    files = get_corpus(corpus)
+    paths = [files[name] for name in ('video_data', 'word_coverage', 'num_video', 'word_counts') if files[name]]
+    stats = [os.stat(path) for path in paths if os.path.exists(path)]
+
+    return ','.join(f'{stat.st_mtime_ns}:{stat.st_size}' for stat in stats)
+
+def get_executor():
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            # jobs left queued or running by a previous process will never finish
+            with transaction() as connection:
+                connection.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'interrupted by a restart', updated = ? "
+                    "WHERE status IN ('queued', 'running')",
+                    (time.time(),)
+                )
+            # spawn rather than fork, since the streamlit server process runs many threads
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+
+    return _executor
+
+# returns the id of the job, reusing a queued, running or finished job with the same parameters and data
+def submit(kind, **params):
+
+    if kind not in JOB_KINDS:
+        raise KeyError(f"Unknown job kind '{kind}'. Registered kinds: {', '.join(JOB_KINDS)}")
+
+    executor = get_executor()
+    key = kind + ':' + json.dumps(params, sort_keys=True)
+    if 'corpus' in params:
+        key += '@' + data_version(params['corpus'])
+
+    with transaction() as connection:
+        existing = connection.execute(
+            "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running', 'done') ORDER BY id DESC LIMIT 1",
+            (key,)
+        ).fetchone()
+        if existing is not None:
+            return existing['id']
+
+        now = time.time()
+        job_id = connection.execute(
+            "INSERT INTO jobs (key, kind, params, status, created, updated) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (key, kind, json.dumps(params), now, now)
+        ).lastrowid
+
+    future = executor.submit(run_job, JOBS_DB, job_id)
+    future.add_done_callback(lambda future: mark_crashed(job_id, future))
+
+    return job_id
+
+# run_job records its own errors, so this only catches workers that died (e.g. killed for using too much memory)
+def mark_crashed(job_id, future):
+
+    if future.cancelled() or future.exception() is None:
+        return
+
+    with transaction() as connection:
+        connection.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ? AND status IN ('queued', 'running')",
+            (repr(future.exception()), time.time(), job_id)
+        )
+
+# runs in a worker process, with one connection for the whole job (every update is committed right away,
+# so the app sees the progress)
+def run_job(path, job_id):
+
+    with contextlib.closing(connect(path)) as connection:
+
+        def update(sql, params):
+            with connection:
+                connection.execute(sql, params)
+
+        row = connection.execute('SELECT kind, params FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        update("UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (time.time(), job_id))
+
+        def progress(fraction):
+            update('UPDATE jobs SET progress = ?, updated = ? WHERE id = ?', (float(fraction), time.time(), job_id))
+
+        try:
+            result = JOB_KINDS[row['kind']](progress, **json.loads(row['params']))
+        except Exception:
+            update(
+                "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                (traceback.format_exc(), time.time(), job_id)
+            )
+            return
+
+        update(
+            "UPDATE jobs SET status = 'done', progress = 1, result = ?, updated = ? WHERE id = ?",
+            (pickle.dumps(result), time.time(), job_id)
+        )
+
+# the job's status, progress and error (if it failed), without its result
+def get_job(job_id):
+
+    with transaction() as connection:
+        row = connection.execute(
+            'SELECT id, kind, params, status, progress, error, created, updated FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+
+    if row is None:
+        raise KeyError(f'Unknown job {job_id}')
+
+    return dict(row)
+
+def get_result(job_id):
+
+    with transaction() as connection:
+        row = connection.execute("SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+
+    return None if row is None else pickle.loads(row['result'])
+
+###
+# JOB KINDS
+###
+
+# percentile bootstrap confidence interval of the median of a metric in each level
+@job_kind('bootstrap_medians')
+def bootstrap_medians(progress, corpus, column, n_resamples=10000, confidence=0.95, seed=0):
+
+    video_df, _, _ = read_tables(corpus)
+    levels = get_corpus(corpus)['levels']
+    rng = np.random.default_rng(seed)
+
+    # resampled in chunks to bound memory and report progress along the way
+    chunk = 500
+    rows = []
+    for i, level in enumerate(levels):
+
+        values = video_df.loc[video_df['level'] == level, column].to_numpy(dtype=np.float64)
+        medians = []
+        for start in range(0, n_resamples, chunk):
+            size = min(chunk, n_resamples - start)
+            samples = values[rng.integers(0, len(values), size=(size, len(values)))]
+            medians.append(np.median(samples, axis=1))
+            progress((i + (start + size) / n_resamples) / len(levels))
+
+        low, high = np.quantile(np.concatenate(medians), [(1 - confidence) / 2, (1 + confidence) / 2])
+        rows.append({'Median': np.median(values), 'Lower': low, 'Upper': high})
+
+    return pd.DataFrame(rows, index=levels)
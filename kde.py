@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from partitions import sorted_quantile
+
+# Gaussian kernel density estimates on a fixed grid, with binned KDE: the values are first spread over the
+# grid points (linear binning, one bincount), then the grid counts are convolved with the kernel sampled at
+# the grid spacing through an FFT. The cost is linear in the number of values plus n log n in the number of
+# grid points, instead of one kernel evaluation per (value, grid point) pair.
+
+DEFAULT_POINTS = 128
+
+# Silverman's rule of thumb, from already sorted values
+def silverman_bandwidth(values):
+
+    if len(values) < 2:
+        return np.nan
+
+    spread = np.std(values, ddof=1)
+    iqr = sorted_quantile(values, 0.75) - sorted_quantile(values, 0.25)
+    if iqr > 0:
+        spread = min(spread, iqr / 1.34)
+
+    return 0.9 * spread * len(values) ** -0.2
+
+# counts of values spread over n_points evenly spaced grid points from low to high, each value split
+# between its two neighbouring points in proportion to how close it is to them
+def linear_binning(values, low, high, n_points):
+
+    position = (np.asarray(values, dtype=np.float64) - low) / (high - low) * (n_points - 1)
+    left = np.clip(np.floor(position).astype(np.int64), 0, n_points - 2)
+    right_weight = np.clip(position - left, 0.0, 1.0)
+
+    return (np.bincount(left, weights=1.0 - right_weight, minlength=n_points)
+            + np.bincount(left + 1, weights=right_weight, minlength=n_points))
+
+# density of values at n_points evenly spaced grid points from low to high
+def binned_kde(values, low, high, bandwidth, n_points=DEFAULT_POINTS):
+
+    grid = np.linspace(low, high, n_points)
+    if len(values) == 0 or not bandwidth > 0 or high <= low:
+        return grid, np.zeros(n_points)
+
+    counts = linear_binning(values, low, high, n_points)
+
+    # the kernel only needs to reach 4 bandwidths (or across the whole grid)
+    delta = (high - low) / (n_points - 1)
+    half = int(min(n_points - 1, np.ceil(4 * bandwidth / delta)))
+    offsets = np.arange(-half, half + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    # zero padded to a power of two at least as long as the full convolution, so it doesn't wrap around
+    size = 1 << int(np.ceil(np.log2(n_points + 2 * half)))
+    convolved = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+
+    return grid, np.maximum(convolved[half:half + n_points], 0.0) / len(values)
+
+# density curve of a metric in every level, on one grid spanning the values of all levels
+# (values above max_value are left out, like the videos a histogram doesn't show)
+def level_densities(partitions, metric, n_points=DEFAULT_POINTS, scale=1.0, max_value=None):
+
+    values = {}
+    for level, (start, stop) in partitions['bounds'].items():
+        level_values = scale * partitions['sorted'][metric][start:stop]
+        level_values = level_values[~np.isnan(level_values)]
+        if max_value is not None:
+            level_values = level_values[level_values <= max_value]
+        values[level] = level_values
+
+    non_empty = [level_values for level_values in values.values() if len(level_values)]
+    if not non_empty:
+        return pd.DataFrame({'x': [], 'density': [], 'level': []})
+    low = min(level_values[0] for level_values in non_empty)
+    high = max(level_values[-1] for level_values in non_empty)
+
+    curves = []
+    for level, level_values in values.items():
+        grid, density = binned_kde(level_values, low, high, silverman_bandwidth(level_values), n_points)
+        curves.append(pd.DataFrame({
+            'x': grid.astype(np.float32),
+            'density': density.astype(np.float32),
+            'level': level,
+        }))
+
+    return pd.concat(curves, ignore_index=True)
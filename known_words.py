@@ -0,0 +1,69 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from word_counts import normalize_word, row_sums
+
+HTML_TAG = re.compile(r'<[^>]+>')
+FURIGANA = re.compile(r'\[[^\]]*\]')
+SEPARATORS = re.compile(r'[\s,、]+')
+
+# Reads a known-words list: either plain text (one or more words per line) or an Anki
+# "Notes in Plain Text" export, where the word is the first field of every note.
+def parse_known_words(text):
+
+    words = set()
+    for line in text.splitlines():
+
+        # Anki export headers, e.g. '#separator:tab'
+        if line.startswith('#'):
+            continue
+
+        field = line.split('\t', 1)[0]
+        # Anki fields can hold html and furigana, e.g. '<b>漢字[かんじ]</b>'
+        field = FURIGANA.sub('', HTML_TAG.sub('', field))
+
+        for word in SEPARATORS.split(field):
+            word = normalize_word(word)
+            if word:
+                words.add(word)
+
+    return words
+
+# returns (token ids of the known words that are in the vocabulary, number of words that aren't)
+def to_token_ids(known_words, token_ids):
+
+    ids = [token_ids[word] for word in known_words if word in token_ids]
+
+    return np.unique(np.array(ids, dtype=np.int64)), len(known_words) - len(ids)
+
+# share of every video's tokens (and number of distinct words) covered by the known token ids.
+# A single sparse matrix-vector product over the word counts (see word_counts.py): gather the known
+# flag of every stored word, then sum each row
+def score_videos(word_counts, known_ids):
+
+    known = np.zeros(len(word_counts['vocab']), dtype=bool)
+    known[known_ids] = True
+
+    data = np.asarray(word_counts['data'], dtype=np.int64)
+    known_entries = known[word_counts['indices']]
+
+    totals = row_sums(word_counts, data)
+    coverages = row_sums(word_counts, np.where(known_entries, data, 0)) / np.maximum(totals, 1)
+    unknown_words = np.diff(word_counts['indptr']) - row_sums(word_counts, known_entries)
+
+    return coverages, unknown_words
+
+# the videos ranked by how much of them the learner would understand
+def recommend(word_counts, video_df, known_ids, top=20):
+
+    coverages, unknown_words = score_videos(word_counts, known_ids)
+
+    ranked = pd.DataFrame({
+        'Level': video_df.set_index('video')['level'].reindex(word_counts['video_ids']).to_numpy(),
+        'Word coverage (%)': 100.0 * coverages,
+        'Unknown words': unknown_words,
+    }, index=pd.Index(word_counts['video_ids'], name='Video'))
+
+    return ranked.sort_values(['Word coverage (%)', 'Unknown words'], ascending=[False, True]).head(top)
@@ -0,0 +1,138 @@
+import logging
+import os
+import resource
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import matplotlib.pyplot as plt
+from streamlit import runtime
+
+import instrumentation
+
+# the metrics are served from a separate port, since streamlit doesn't let apps add routes to its own server.
+# set CIJ_METRICS_PORT=0 to turn the exporter off
+METRICS_PORT = int(os.environ.get('CIJ_METRICS_PORT', '9101'))
+
+logger = logging.getLogger('cij.metrics')
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+def rss_bytes():
+
+    # current resident set size on linux, peak resident set size elsewhere
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def active_sessions():
+
+    if not runtime.exists():
+        return 0
+
+    # streamlit has no public api for this, so read it off the session manager
+    return runtime.get_instance()._session_mgr.num_active_sessions()
+
+def cache_bytes():
+
+    sizes = defaultdict(int)
+
+    if runtime.exists():
+        for stat in runtime.get_instance().stats_mgr.get_stats():
+            sizes[(stat.category_name, stat.cache_name)] += stat.byte_length
+
+    return sizes
+
+def escape(value):
+
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def metric(lines, name, metric_type, help_text, samples):
+
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {metric_type}')
+    for labels, value in samples:
+        label_str = ','.join(f'{key}="{escape(val)}"' for key, val in labels.items())
+        lines.append(f'{name}{{{label_str}}} {value}' if label_str else f'{name} {value}')
+
+# renders the current state of this replica in the prometheus text format
+def render_metrics():
+
+    totals = instrumentation.snapshot()
+    lines = []
+
+    metric(lines, 'cij_active_sessions', 'gauge', 'Number of connected browser sessions.',
+           [({}, active_sessions())])
+
+    metric(lines, 'cij_process_resident_memory_bytes', 'gauge', 'Resident memory of the app process.',
+           [({}, rss_bytes())])
+
+    metric(lines, 'cij_matplotlib_open_figures', 'gauge', 'Matplotlib figures that have not been closed.',
+           [({}, len(plt.get_fignums()))])
+
+    metric(lines, 'cij_cache_memory_bytes', 'gauge', 'Memory used by the streamlit caches.',
+           [({'cache_type': category, 'cache': cache}, size) for (category, cache), size in sorted(cache_bytes().items())])
+
+    run = totals.get('script run', {'count': 0, 'seconds': 0.0})
+    metric(lines, 'cij_script_runs_total', 'counter', 'Completed script reruns.',
+           [({}, run['count'])])
+    metric(lines, 'cij_script_run_seconds_total', 'counter', 'Time spent in script reruns.',
+           [({}, run['seconds'])])
+
+    timed = sorted((name, total) for name, total in totals.items() if total['kind'] != 'run')
+    metric(lines, 'cij_timed_calls_total', 'counter', 'Calls of each page section, builder and render.',
+           [({'kind': total['kind'], 'name': name}, total['count']) for name, total in timed])
+    metric(lines, 'cij_timed_seconds_total', 'counter', 'Time spent in each page section, builder and render.',
+           [({'kind': total['kind'], 'name': name}, total['seconds']) for name, total in timed])
+
+    builders = [(name, total) for name, total in timed if total['kind'] == 'build']
+    metric(lines, 'cij_cache_requests_total', 'counter', 'Cache hits and misses of each builder.',
+           [({'name': name, 'result': 'hit'}, total['hits']) for name, total in builders] +
+           [({'name': name, 'result': 'miss'}, total['misses']) for name, total in builders])
+    metric(lines, 'cij_payload_bytes_total', 'counter', 'Bytes returned by each builder and rendered into the page.',
+           [({'name': name}, total['bytes_total']) for name, total in builders])
+
+    return '\n'.join(lines) + '\n'
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# starts the exporter on a daemon thread; safe to call on every rerun
+def start_server(port=METRICS_PORT):
+
+    global _server, _server_failed
+
+    if not port:
+        return None
+
+    with _server_lock:
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+            except OSError as e:
+                # e.g. another streamlit process on this machine already owns the port
+                logger.warning(f"Could not start the metrics exporter on port {port}: {e}")
+                _server_failed = True
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+    return _server
@@ -0,0 +1,102 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Mora counts of kana readings (as produced by the tokenizer), for the sps metric:
+#   - every kana is one mora, including ん, the sokuon っ/ッ and the long vowel mark ー
+#   - the small kana ゃゅょぁぃぅぇぉゎ (and katakana) merge with the kana before them, きょ is one mora
+#   - anything else (punctuation, spaces, latin letters, leftover kanji) doesn't count
+#
+# Instead of looping over characters in python, a whole batch of readings is joined into one string and
+# its code points go through a precomputed table of mora weights (a translation table from code point to
+# weight) as one numpy array.
+
+SMALL_KANA = 'ぁぃぅぇぉゃゅょゎァィゥェォャュョヮ'
+
+# half-width katakana (ｶﾞ is ｶ followed by a separate ﾞ) and their full-width forms;
+# the separate voicing marks weigh nothing
+HALF_WIDTH = 'ｦｧｨｩｪｫｬｭｮｯｰｱｲｳｴｵｶｷｸｹｺｻｼｽｾｿﾀﾁﾂﾃﾄﾅﾆﾇﾈﾉﾊﾋﾌﾍﾎﾏﾐﾑﾒﾓﾔﾕﾖﾗﾘﾙﾚﾛﾜﾝﾞﾟ'
+FULL_WIDTH = 'ヲァィゥェォャュョッーアイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン゛゜'
+
+MORA_WEIGHTS = np.zeros(0xFFA1, dtype=np.uint8)
+MORA_WEIGHTS[0x3041:0x3097] = 1  # hiragana
+MORA_WEIGHTS[0x30A1:0x30FB] = 1  # katakana
+MORA_WEIGHTS[ord('ー')] = 1
+MORA_WEIGHTS[[ord(kana) for kana in SMALL_KANA]] = 0
+MORA_WEIGHTS[[ord(kana) for kana in HALF_WIDTH]] = MORA_WEIGHTS[[ord(kana) for kana in FULL_WIDTH]]
+
+# mora count of every reading in readings (e.g. all the sentences of a video), as an int64 array
+def count_morae_batch(readings):
+
+    readings = list(readings)
+    if not readings:
+        return np.zeros(0, dtype=np.int64)
+
+    lengths = np.fromiter(map(len, readings), dtype=np.int64, count=len(readings))
+    code_points = np.frombuffer(''.join(readings).encode('utf-32-le'), dtype=np.uint32)
+    # code points past the table (emoji...) land on the last entry, which is 0
+    weights = MORA_WEIGHTS[np.minimum(code_points, len(MORA_WEIGHTS) - 1)]
+
+    cumulative = np.concatenate([[0], np.cumsum(weights, dtype=np.int64)])
+    ends = np.cumsum(lengths)
+    return cumulative[ends] - cumulative[ends - lengths]
+
+def count_morae(reading):
+
+    return int(count_morae_batch([reading])[0])
+
+# total morae of every video, from a dataframe with one row per sentence and a video and a reading column
+def morae_per_video(sentences_df):
+
+    counts = count_morae_batch(sentences_df['reading'].fillna(''))
+
+    return pd.Series(counts, index=sentences_df.index).groupby(sentences_df['video']).sum()
+
+# the straightforward per-character version, kept as a reference for the benchmark
+def naive_count_morae(reading):
+
+    count = 0
+    for char in reading:
+        if char in HALF_WIDTH:
+            char = FULL_WIDTH[HALF_WIDTH.index(char)]
+        if char in SMALL_KANA:
+            continue
+        if 'ぁ' <= char <= 'ゖ' or 'ァ' <= char <= 'ヺ' or char == 'ー':
+            count += 1
+
+    return count
+
+# Usage:
+#   python morae.py sentences.tsv           total morae per video (video and reading columns)
+#   python morae.py --benchmark [--size N]  compares with the per-character loop on N random sentences
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Count the morae of kana readings.')
+    parser.add_argument('path', nargs='?', help='tsv file with one row per sentence')
+    parser.add_argument('--benchmark', action='store_true')
+    # about as many sentences as the CIJ transcripts
+    parser.add_argument('--size', type=int, default=300000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        rng = np.random.default_rng(0)
+        kana = np.array(list('あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをんがぎぐげござじずぜぞだでどばびぶべぼぱぴぷぺぽっーゃゅょアイカキクコサシタチテトナマラリルレンッャュョ、。 '))
+        readings = [''.join(rng.choice(kana, size)) for size in rng.integers(5, 60, args.size)]
+
+        start = time.perf_counter()
+        naive = [naive_count_morae(reading) for reading in readings]
+        naive_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = count_morae_batch(readings)
+        batch_seconds = time.perf_counter() - start
+
+        assert np.array_equal(batch, naive)
+        print(f"{len(readings):,} sentences: per-character loop {naive_seconds:.2f}s, batch {batch_seconds:.2f}s "
+              f"({naive_seconds / batch_seconds:.0f}x faster)")
+
+    else:
+        morae_per_video(pd.read_csv(args.path, sep='\t')).rename('morae').to_csv(sys.stdout, sep='\t')
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# video_df reordered so the videos of each level form one contiguous block (easiest level first), with every
+# metric also kept sorted within each block, and the coverage curves laid out the same way. Filtering a level
+# is then a slice, and a per-level quantile is a lookup into an already sorted block, instead of a boolean
+# mask (or a groupby) over every video.
+def build_partitions(video_df, word_coverage_df, levels, metrics):
+
+    level_ids = {level: i for i, level in enumerate(levels)}
+
+    # videos with a level that isn't in the taxonomy are left out, as in the charts
+    video_level_ids = video_df['level'].map(level_ids)
+    video_df = video_df.loc[video_level_ids.notna()]
+    video_level_ids = video_level_ids.dropna().to_numpy(dtype=np.int64)
+
+    order = np.argsort(video_level_ids, kind='stable')
+    videos = video_df.iloc[order].reset_index(drop=True)
+    starts = np.concatenate([[0], np.cumsum(np.bincount(video_level_ids, minlength=len(levels)))])
+
+    sorted_values = {}
+    for metric in metrics:
+        values = videos[metric].to_numpy(dtype=np.float64)
+        sorted_values[metric] = np.concatenate([np.sort(values[starts[i]:starts[i + 1]]) for i in range(len(levels))])
+
+    curve_level_ids = word_coverage_df['level'].map(level_ids)
+    curves = word_coverage_df.loc[curve_level_ids.notna()].assign(level_id=curve_level_ids.dropna())
+    curves = curves.sort_values(['level_id', 'rank'], kind='stable').drop(columns='level_id').reset_index(drop=True)
+    curve_starts = np.searchsorted(curves['level'].map(level_ids).to_numpy(), np.arange(len(levels) + 1), side='left')
+
+    return {
+        'levels': list(levels),
+        'video_df': videos,
+        'bounds': {level: (int(starts[i]), int(starts[i + 1])) for i, level in enumerate(levels)},
+        'sorted': sorted_values,
+        'word_coverage_df': curves,
+        'curve_bounds': {level: (int(curve_starts[i]), int(curve_starts[i + 1])) for i, level in enumerate(levels)},
+    }
+
+def level_videos(partitions, level):
+
+    start, stop = partitions['bounds'][level]
+
+    return partitions['video_df'].iloc[start:stop]
+
+def level_coverage_curve(partitions, level):
+
+    start, stop = partitions['curve_bounds'][level]
+
+    return partitions['word_coverage_df'].iloc[start:stop]
+
+# q-th quantile (0 to 1) of a sorted array, with the same linear interpolation as pandas and numpy
+def sorted_quantile(values, q):
+
+    if len(values) == 0:
+        return np.nan
+
+    position = q * (len(values) - 1)
+    low = int(np.floor(position))
+    high = min(low + 1, len(values) - 1)
+
+    return values[low] + (position - low) * (values[high] - values[low])
+
+# q-th quantile of a metric in every level, as a series indexed by level
+def level_quantiles(partitions, metric, q, scale=1.0):
+
+    values = partitions['sorted'][metric]
+
+    return pd.Series({
+        # scales before interpolating, so the result matches a quantile taken over the scaled column
+        level: sorted_quantile(scale * values[start:stop], q)
+        for level, (start, stop) in partitions['bounds'].items()
+    })
+
+# median of every metric in every level (one row per level, one column per metric)
+def level_medians(partitions, metrics):
+
+    return pd.DataFrame({metric: level_quantiles(partitions, metric, 0.5) for metric in metrics}).rename_axis('level')
@@ -0,0 +1,126 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Universal Dependencies part-of-speech tags, the columns of the tag count matrix
+UD_TAGS = [
+    'ADJ', 'ADP', 'ADV', 'AUX', 'CCONJ', 'DET', 'INTJ', 'NOUN', 'NUM',
+    'PART', 'PRON', 'PROPN', 'PUNCT', 'SCONJ', 'SYM', 'VERB', 'X',
+]
+TAG_IDS = {tag: i for i, tag in enumerate(UD_TAGS)}
+
+# the grammar columns of video_data.tsv and the tags each one counts. A new proportion only needs a new
+# entry here, since it's computed from the stored counts without tagging the transcripts again
+POS_PROPS = {
+    'adv_props': ['ADV'],
+    'det_props': ['DET'],
+    'noun_props': ['NOUN'],
+    'sconj_props': ['SCONJ'],
+    'aux_props': ['AUX'],
+    'num_props': ['NUM'],
+    'pron_props': ['PRON'],
+    'verb_props': ['VERB'],
+}
+
+# punctuation was removed before computing the statistics, so it's left out of the totals
+EXCLUDED_TAGS = ['PUNCT']
+
+DEFAULT_MODEL = 'ja_core_news_sm'
+
+def load_tagger(model=DEFAULT_MODEL):
+
+    # spaCy (with a Japanese pipeline) is only needed to tag new transcripts, not to run the app
+    try:
+        import spacy
+    except ImportError:
+        raise ImportError(f"Tagging needs spaCy and a Japanese pipeline: pip install spacy && python -m spacy download {model}")
+
+    return spacy.load(model, exclude=['parser', 'ner', 'lemmatizer', 'attribute_ruler', 'senter'])
+
+# Tags every sentence (one row per sentence with a video and a text column) in batches and returns
+# (video ids, tag count matrix): one row per video, one uint32 column per UD tag.
+def tag_counts(sentences_df, nlp, batch_size=256):
+
+    video_ids, rows = np.unique(sentences_df['video'].to_numpy(), return_inverse=True)
+
+    token_rows = []
+    token_tags = []
+    for row, doc in zip(rows, nlp.pipe(sentences_df['text'].fillna('').tolist(), batch_size=batch_size)):
+        tags = [TAG_IDS.get(token.pos_, TAG_IDS['X']) for token in doc]
+        token_rows.append(np.full(len(tags), row, dtype=np.int64))
+        token_tags.append(np.array(tags, dtype=np.int64))
+
+    token_rows = np.concatenate(token_rows) if token_rows else np.zeros(0, dtype=np.int64)
+    token_tags = np.concatenate(token_tags) if token_tags else np.zeros(0, dtype=np.int64)
+
+    counts = np.bincount(token_rows * len(UD_TAGS) + token_tags, minlength=len(video_ids) * len(UD_TAGS))
+
+    return video_ids, counts.reshape(len(video_ids), len(UD_TAGS)).astype(np.uint32)
+
+def save_tag_counts(path, video_ids, counts):
+
+    np.savez_compressed(path, video_ids=video_ids, counts=counts, tags=np.array(UD_TAGS))
+
+# returns (video ids, tag count matrix), with the columns in UD_TAGS order
+def load_tag_counts(path):
+
+    with np.load(path) as f:
+        tags = list(f['tags'])
+        counts = f['counts']
+        # files written with a different tag list still line up with UD_TAGS
+        if tags != UD_TAGS:
+            aligned = np.zeros((len(counts), len(UD_TAGS)), dtype=counts.dtype)
+            for i, tag in enumerate(tags):
+                aligned[:, TAG_IDS.get(tag, TAG_IDS['X'])] += counts[:, i]
+            counts = aligned
+        return f['video_ids'], counts
+
+# every proportion in props (column -> tags) for every video, with one matrix product and one division
+def pos_props(video_ids, counts, props=POS_PROPS):
+
+    selection = np.zeros((len(UD_TAGS), len(props)), dtype=np.float64)
+    for j, tags in enumerate(props.values()):
+        selection[[TAG_IDS[tag] for tag in tags], j] = 1.0
+
+    included = np.ones(len(UD_TAGS), dtype=np.float64)
+    included[[TAG_IDS[tag] for tag in EXCLUDED_TAGS]] = 0.0
+
+    counts = counts.astype(np.float64)
+    totals = counts @ included
+
+    return pd.DataFrame(
+        (counts @ selection) / np.maximum(totals, 1.0)[:, None],
+        index=pd.Index(video_ids, name='video'),
+        columns=list(props)
+    )
+
+# Usage:
+#   python pos_tags.py tag sentences.tsv --out pos_counts.npz [--model ja_core_news_sm]
+#   python pos_tags.py props pos_counts.npz > grammar.tsv
+#
+# sentences.tsv has one row per sentence with a video and a text column.
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Tag transcripts and compute the part-of-speech proportions.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    tag_parser = subparsers.add_parser('tag')
+    tag_parser.add_argument('path')
+    tag_parser.add_argument('--out', default='pos_counts.npz')
+    tag_parser.add_argument('--model', default=DEFAULT_MODEL)
+    tag_parser.add_argument('--batch-size', type=int, default=256)
+
+    props_parser = subparsers.add_parser('props')
+    props_parser.add_argument('path')
+
+    args = parser.parse_args()
+
+    if args.command == 'tag':
+        video_ids, counts = tag_counts(pd.read_csv(args.path, sep='\t'), load_tagger(args.model), args.batch_size)
+        save_tag_counts(args.out, video_ids, counts)
+        print(f"Wrote the tag counts of {len(video_ids)} videos to {args.out}")
+
+    else:
+        pos_props(*load_tag_counts(args.path)).to_csv(sys.stdout, sep='\t')
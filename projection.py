@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+# A map of the videos by their whole statistics profile: the standardized metrics projected on their first
+# principal components, plus a k-d tree over the projected videos to find the videos closest to one of them.
+#
+#   projection = build_projection(video_df, metrics)
+#   projection['scores'][:, :2]            map coordinates of every video
+#   nearest(projection, video=938, k=5)    video ids and distances of its 5 closest videos
+
+DEFAULT_COMPONENTS = 5
+LEAF_SIZE = 16
+
+# z-scores of every column as float32, with missing values at the column mean (0)
+def standardize(matrix):
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    means = np.nanmean(matrix, axis=0)
+    stds = np.nanstd(matrix, axis=0)
+    stds[~(stds > 0)] = 1.0
+
+    return np.nan_to_num((matrix - means) / stds).astype(np.float32)
+
+# rank-k SVD from a random projection (Halko et al.): the range of the matrix is sampled with a few more
+# random vectors than needed, refined with power iterations, and the exact SVD is only taken of the small
+# projected matrix
+def randomized_svd(matrix, rank, oversample=10, n_iter=4, seed=0):
+
+    rng = np.random.default_rng(seed)
+    size = min(rank + oversample, *matrix.shape)
+
+    sample = matrix @ rng.standard_normal((matrix.shape[1], size)).astype(matrix.dtype)
+    basis, _ = np.linalg.qr(sample)
+    for _ in range(n_iter):
+        basis, _ = np.linalg.qr(matrix.T @ basis)
+        basis, _ = np.linalg.qr(matrix @ basis)
+
+    u, s, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+
+    return (basis @ u)[:, :rank], s[:rank], vt[:rank]
+
+# A k-d tree stored as flat arrays: the points are reordered so every node's points are one contiguous
+# slice, and each internal node splits its slice at the median of its widest dimension.
+def build_kdtree(points, leaf_size=LEAF_SIZE):
+
+    points = np.asarray(points, dtype=np.float64)
+    order = np.arange(len(points))
+    nodes = []  # (start, stop, split dimension, split value, left child, right child)
+
+    def build(start, stop):
+
+        node = len(nodes)
+        nodes.append(None)
+        if stop - start <= leaf_size:
+            nodes[node] = (start, stop, -1, 0.0, -1, -1)
+            return node
+
+        node_points = points[order[start:stop]]
+        dimension = int(np.argmax(node_points.max(axis=0) - node_points.min(axis=0)))
+        middle = (stop - start) // 2
+        order[start:stop] = order[start:stop][np.argpartition(node_points[:, dimension], middle)]
+        split = points[order[start + middle], dimension]
+
+        left = build(start, start + middle)
+        right = build(start + middle, stop)
+        nodes[node] = (start, stop, dimension, split, left, right)
+        return node
+
+    build(0, len(points))
+    nodes = np.array(nodes, dtype=np.float64).reshape(-1, 6)
+
+    return {
+        'points': points[order],
+        'order': order,
+        'bounds': nodes[:, :2].astype(np.int64),
+        'dimension': nodes[:, 2].astype(np.int64),
+        'split': nodes[:, 3],
+        'children': nodes[:, 4:].astype(np.int64),
+    }
+
+# rows (in the original order) and distances of the k points closest to point, closest first
+def query_kdtree(tree, point, k):
+
+    point = np.asarray(point, dtype=np.float64)
+    k = min(k, len(tree['points']))
+    best_rows = np.zeros(0, dtype=np.int64)
+    best_distances = np.zeros(0)
+
+    # (lower bound of the distance to the node, node), visiting the side of each split the point is on first
+    stack = [(0.0, 0)]
+    while stack:
+        bound, node = stack.pop()
+        if len(best_distances) == k and bound > best_distances[-1]:
+            continue
+
+        dimension = tree['dimension'][node]
+        if dimension < 0:
+            start, stop = tree['bounds'][node]
+            distances = np.sqrt(((tree['points'][start:stop] - point) ** 2).sum(axis=1))
+            best_rows = np.concatenate([best_rows, np.arange(start, stop)])
+            best_distances = np.concatenate([best_distances, distances])
+            keep = np.argsort(best_distances, kind='stable')[:k]
+            best_rows, best_distances = best_rows[keep], best_distances[keep]
+            continue
+
+        gap = point[dimension] - tree['split'][node]
+        near, far = tree['children'][node] if gap < 0 else tree['children'][node][::-1]
+        stack.append((max(bound, abs(gap)), far))
+        stack.append((bound, near))
+
+    return tree['order'][best_rows], best_distances
+
+# principal components of the standardized metrics of every video, and a k-d tree over them
+def build_projection(video_df, metrics, n_components=DEFAULT_COMPONENTS):
+
+    matrix = standardize(video_df[metrics].to_numpy())
+    matrix = matrix - matrix.mean(axis=0)
+    n_components = min(n_components, *matrix.shape)
+
+    u, s, vt = randomized_svd(matrix, n_components)
+    # the sign of a component is arbitrary, so each one points towards its largest loading to keep the map stable
+    signs = np.sign(vt[np.arange(len(vt)), np.abs(vt).argmax(axis=1)])
+    u, vt = u * signs, vt * signs[:, None]
+    scores = u * s
+    total_variance = float((matrix.astype(np.float64) ** 2).sum())
+
+    return {
+        'video_ids': video_df['video'].to_numpy(),
+        'levels': video_df['level'].to_numpy(),
+        'scores': scores.astype(np.float32),
+        'components': pd.DataFrame(vt.T, index=metrics),
+        'explained_variance_ratio': (s.astype(np.float64) ** 2) / max(total_variance, 1e-12),
+        'tree': build_kdtree(scores),
+    }
+
+# the k videos closest to a video (itself excluded), by distance over the principal components
+def nearest(projection, video, k=5):
+
+    row = int(np.flatnonzero(projection['video_ids'] == video)[0])
+    rows, distances = query_kdtree(projection['tree'], projection['scores'][row], k + 1)
+    keep = rows != row
+
+    return pd.DataFrame({
+        'video': projection['video_ids'][rows[keep]][:k],
+        'level': projection['levels'][rows[keep]][:k],
+        'distance': distances[keep][:k],
+    })
+
+# the map as counts of videos per level on a bins x bins grid over the first two components, so the size
+# of the chart data doesn't grow with the number of videos
+def binned_map(projection, bins=40):
+
+    x, y = projection['scores'][:, 0], projection['scores'][:, 1]
+    levels, level_ids = np.unique(projection['levels'], return_inverse=True)
+
+    x_edges = np.linspace(x.min(), x.max(), bins + 1)
+    y_edges = np.linspace(y.min(), y.max(), bins + 1)
+    x_bins = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins - 1)
+    y_bins = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins - 1)
+
+    counts = np.bincount((level_ids * bins + x_bins) * bins + y_bins, minlength=len(levels) * bins * bins)
+    cells = np.flatnonzero(counts)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    return pd.DataFrame({
+        'pc1': x_centers[(cells // bins) % bins].astype(np.float32),
+        'pc2': y_centers[cells % bins].astype(np.float32),
+        'level': levels[cells // (bins * bins)],
+        'videos': counts[cells],
+    })
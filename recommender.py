@@ -0,0 +1,155 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from projection import standardize
+
+# Similar videos by their statistics: every video is a row of standardized float32 metrics, and the
+# neighbours of a batch of videos come from one matrix product per block of query rows, so finding the
+# neighbours of every video at once is a handful of matrix products rather than one query per video.
+#
+#   index = build_feature_index(video_df, metrics)
+#   similar_videos(index, video=938, k=5, metric='cosine', levels=['Advanced'])
+
+BLOCK_SIZE = 1024
+# candidate videos scored against a block of query rows at a time, so the (block, candidates) score
+# matrices stay bounded (32 MB of float32) however many videos there are
+CANDIDATE_BLOCK_SIZE = 8192
+METRICS = ['cosine', 'euclidean']
+
+def build_feature_index(video_df, metrics):
+
+    features = standardize(video_df[metrics].to_numpy())
+    norms = np.sqrt((features.astype(np.float64) ** 2).sum(axis=1))
+    # integer level codes, to group the videos by level without comparing strings
+    _, level_ids = np.unique(video_df['level'].to_numpy(), return_inverse=True)
+
+    return {
+        'video_ids': video_df['video'].to_numpy(),
+        'levels': video_df['level'].to_numpy(),
+        'level_ids': level_ids,
+        'features': features,
+        'unit_features': (features / np.maximum(norms, 1e-12)[:, None]).astype(np.float32),
+        'squared_norms': (norms ** 2).astype(np.float32),
+    }
+
+# top_k over the given candidate rows (sorted): the candidates are scored in blocks of
+# candidate_block_size, keeping the k best of every query row so far
+def candidate_top_k(index, rows, candidates, k, metric, block_size=BLOCK_SIZE, candidate_block_size=CANDIDATE_BLOCK_SIZE):
+
+    features = index['unit_features'] if metric == 'cosine' else index['features']
+    best_rows = np.full((len(rows), k), -1, dtype=np.int64)
+    best_scores = np.full((len(rows), k), np.nan, dtype=np.float32)
+
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        block_rows = np.full((len(block), k), -1, dtype=np.int64)
+        block_scores = np.full((len(block), k), -np.inf, dtype=np.float32)
+
+        for candidate_start in range(0, len(candidates), candidate_block_size):
+            columns = candidates[candidate_start:candidate_start + candidate_block_size]
+            scores = features[block] @ features[columns].T
+
+            # higher is better for both: cosine similarity, or minus the squared euclidean distance
+            if metric == 'euclidean':
+                scores *= 2
+                scores -= index['squared_norms'][block][:, None]
+                scores -= index['squared_norms'][columns][None, :]
+            # the query videos that are among these candidates
+            positions = np.minimum(np.searchsorted(columns, block), len(columns) - 1)
+            is_candidate = columns[positions] == block
+            scores[np.flatnonzero(is_candidate), positions[is_candidate]] = -np.inf
+
+            # the k best of this candidate block, merged with the k best so far
+            candidate_k = min(k, len(columns))
+            top = np.argpartition(scores, -candidate_k, axis=1)[:, -candidate_k:]
+            merged_scores = np.concatenate([block_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            merged_rows = np.concatenate([block_rows, columns[top]], axis=1)
+            order = np.argsort(-merged_scores, axis=1, kind='stable')[:, :k]
+            block_scores = np.take_along_axis(merged_scores, order, axis=1)
+            block_rows = np.take_along_axis(merged_rows, order, axis=1)
+
+        found = np.isfinite(block_scores)
+        if metric == 'euclidean':
+            block_scores = np.sqrt(np.maximum(-block_scores, 0.0))
+        best_rows[start:start + len(block)] = np.where(found, block_rows, -1)
+        best_scores[start:start + len(block)] = np.where(found, block_scores, np.nan)
+
+    return best_rows, best_scores
+
+# rows and similarities (cosine) or distances (euclidean) of the k nearest videos of every row in rows,
+# most similar first, as two (len(rows), k) arrays. A video is never its own neighbour. With levels only
+# videos of those levels are candidates, and with same_level only videos of the query video's level
+# (missing neighbours have row -1).
+def top_k(index, rows, k=5, metric='cosine', levels=None, same_level=False, block_size=BLOCK_SIZE,
+          candidate_block_size=CANDIDATE_BLOCK_SIZE):
+
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+    rows = np.asarray(rows, dtype=np.int64)
+    candidates = np.arange(len(index['video_ids']))
+    if levels is not None:
+        candidates = np.flatnonzero(np.isin(index['levels'], list(levels)))
+    k = min(k, len(index['video_ids']))
+
+    if not same_level:
+        return candidate_top_k(index, rows, candidates, k, metric, block_size, candidate_block_size)
+
+    # the query rows of each level against the candidates of that level, so no pair is masked out
+    best_rows = np.full((len(rows), k), -1, dtype=np.int64)
+    best_scores = np.full((len(rows), k), np.nan, dtype=np.float32)
+    level_ids = index['level_ids']
+    for level_id in np.unique(level_ids[rows]):
+        selected = np.flatnonzero(level_ids[rows] == level_id)
+        best_rows[selected], best_scores[selected] = candidate_top_k(
+            index, rows[selected], candidates[level_ids[candidates] == level_id], k, metric, block_size, candidate_block_size
+        )
+
+    return best_rows, best_scores
+
+# the k videos most similar to a video, as a dataframe
+def similar_videos(index, video, k=5, metric='cosine', levels=None):
+
+    row = int(np.flatnonzero(index['video_ids'] == video)[0])
+    rows, scores = top_k(index, [row], k=k, metric=metric, levels=levels)
+    found = rows[0] >= 0
+
+    return pd.DataFrame({
+        'video': index['video_ids'][rows[0][found]],
+        'level': index['levels'][rows[0][found]],
+        'similarity' if metric == 'cosine' else 'distance': scores[0][found],
+    })
+
+# the k neighbours of every video, one row per (video, neighbour), for precomputing recommendations
+def all_similar_videos(index, k=5, metric='cosine', same_level=False):
+
+    rows, scores = top_k(index, np.arange(len(index['video_ids'])), k=k, metric=metric, same_level=same_level)
+    found = rows >= 0
+
+    return pd.DataFrame({
+        'video': np.repeat(index['video_ids'], k)[found.ravel()],
+        'rank': np.tile(np.arange(1, k + 1), len(rows))[found.ravel()],
+        'similar_video': index['video_ids'][rows[found]],
+        'similar_level': index['levels'][rows[found]],
+        'similarity' if metric == 'cosine' else 'distance': scores[found],
+    })
+
+# Usage:
+#   python recommender.py video_data.tsv [--k 5] [--metric cosine] [--same-level] > similar_videos.tsv
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Precompute the most similar videos of every video.')
+    parser.add_argument('path', help='video_data.tsv')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--metric', choices=METRICS, default='cosine')
+    parser.add_argument('--same-level', action='store_true', help='only recommend videos of the same level')
+    args = parser.parse_args()
+
+    video_df = pd.read_csv(args.path, sep='\t')
+    metrics = [column for column in video_df.columns if column not in ('video', 'level')]
+    index = build_feature_index(video_df, metrics)
+
+    all_similar_videos(index, args.k, args.metric, args.same_level).to_csv(sys.stdout, sep='\t', index=False)
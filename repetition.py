@@ -0,0 +1,142 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from word_counts import normalize_word, rel_reps_from_distinct
+
+# Repetition metrics over the token streams of the videos. A corpus is one int32 array of token ids, all
+# the videos one after the other, with offsets[i]:offsets[i + 1] the tokens of video i (and optionally the
+# time in seconds of every token, e.g. the start of its subtitle cue).
+#
+# Every variant comes from the same two arrays, the position of the previous and of the next occurrence of
+# each token in its video (-1 if there's none). Both come out of one stable sort of the (video, token id)
+# pairs, so adding a variant costs a comparison over the stream rather than another pass over the text.
+
+# (token ids, offsets, video ids) from a dataframe with one row per token and a video and a lemma column, in order
+def token_stream(tokens_df):
+
+    tokens, _ = pd.factorize(tokens_df['lemma'].map(normalize_word))
+    video_ids, starts, counts = np.unique(tokens_df['video'].to_numpy(), return_index=True, return_counts=True)
+    if (np.diff(starts) != counts[:-1]).any():
+        raise ValueError("The tokens of every video must be contiguous and the videos sorted by number")
+
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return tokens.astype(np.int32), offsets, video_ids
+
+# positions of the previous and next occurrence of every token within its video (-1 if none)
+def occurrences(tokens, offsets):
+
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    keys = rows.astype(np.int64) * (int(tokens.max(initial=0)) + 1) + tokens
+
+    # stable, so the occurrences of a word in a video stay in stream order
+    order = np.argsort(keys, kind='stable')
+    same = keys[order][1:] == keys[order][:-1]
+
+    previous = np.full(len(tokens), -1, dtype=np.int64)
+    following = np.full(len(tokens), -1, dtype=np.int64)
+    previous[order[1:][same]] = order[:-1][same]
+    following[order[:-1][same]] = order[1:][same]
+
+    return previous, following
+
+def per_video_mean(offsets, values):
+
+    cumulative = np.concatenate([[0], np.cumsum(values, dtype=np.float64)])
+    lengths = np.diff(offsets)
+
+    return np.where(lengths > 0, (cumulative[offsets[1:]] - cumulative[offsets[:-1]]) / np.maximum(lengths, 1), np.nan)
+
+# Columns for every video:
+#   average_rel_reps         as in video_data.tsv, 1 / distinct words (see word_counts.py)
+#   repeat_rate              share of tokens that already appeared earlier in the video
+#   repeat_rate_<n>_tokens   share of tokens that appeared within the n tokens before them
+#   recur_rate_<s>s          share of tokens that come up again within the next s seconds (needs times)
+def repetition_metrics(tokens, offsets, video_ids, times=None, token_windows=(50,), seconds_windows=(30,)):
+
+    previous, following = occurrences(tokens, offsets)
+    positions = np.arange(len(tokens))
+    first = previous < 0
+
+    distinct = np.diff(np.concatenate([[0], np.cumsum(first)])[offsets])
+    metrics = pd.DataFrame({
+        'average_rel_reps': rel_reps_from_distinct(distinct),
+        'repeat_rate': per_video_mean(offsets, ~first),
+    }, index=pd.Index(video_ids, name='video'))
+
+    for window in token_windows:
+        metrics[f'repeat_rate_{window}_tokens'] = per_video_mean(offsets, ~first & (positions - previous <= window))
+
+    if times is not None:
+        times = np.asarray(times, dtype=np.float64)
+        recurs = following >= 0
+        gaps = np.full(len(tokens), np.inf)
+        gaps[recurs] = times[following[recurs]] - times[recurs]
+        for window in seconds_windows:
+            metrics[f'recur_rate_{window:g}s'] = per_video_mean(offsets, gaps <= window)
+
+    return metrics
+
+# the per-token dictionary version, kept as a reference for the benchmark
+def naive_repeat_rates(tokens, offsets, window=50):
+
+    rates = []
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        last_seen = {}
+        repeats = 0
+        near_repeats = 0
+        for position in range(start, end):
+            token = tokens[position]
+            if token in last_seen:
+                repeats += 1
+                near_repeats += position - last_seen[token] <= window
+            last_seen[token] = position
+        length = max(end - start, 1)
+        rates.append((repeats / length, near_repeats / length))
+
+    return np.array(rates)
+
+# Usage:
+#   python repetition.py tokens.tsv [--time-column start] [--window-tokens 50] [--window-seconds 30] > repetition.tsv
+#   python repetition.py --benchmark [--size N]   compares with a per-token dict loop on N random tokens
+#
+# tokens.tsv has one row per token, in order, with a video and a lemma column (and the time column if given).
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compute repetition metrics from the token stream of every video.')
+    parser.add_argument('path', nargs='?', help='tsv file with one row per token')
+    parser.add_argument('--time-column', help='column with the time of every token, in seconds')
+    parser.add_argument('--window-tokens', type=int, nargs='+', default=[50])
+    parser.add_argument('--window-seconds', type=float, nargs='+', default=[30])
+    parser.add_argument('--benchmark', action='store_true')
+    # about as many tokens as the CIJ transcripts
+    parser.add_argument('--size', type=int, default=3000000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        rng = np.random.default_rng(0)
+        tokens = ((rng.zipf(1.3, args.size) - 1) % 30000).astype(np.int32)
+        offsets = np.concatenate([[0], np.sort(rng.choice(np.arange(1, args.size), 1000, replace=False)), [args.size]])
+
+        start = time.perf_counter()
+        naive = naive_repeat_rates(tokens, offsets)
+        naive_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        metrics = repetition_metrics(tokens, offsets, np.arange(len(offsets) - 1))
+        vectorized_seconds = time.perf_counter() - start
+
+        assert np.allclose(metrics[['repeat_rate', 'repeat_rate_50_tokens']].to_numpy(), naive)
+        print(f"{args.size:,} tokens: per-token loop {naive_seconds:.2f}s, vectorized {vectorized_seconds:.2f}s "
+              f"({naive_seconds / vectorized_seconds:.0f}x faster)")
+
+    else:
+        columns = ['video', 'lemma'] + ([args.time_column] if args.time_column else [])
+        tokens_df = pd.read_csv(args.path, sep='\t', usecols=columns)
+        tokens, offsets, video_ids = token_stream(tokens_df)
+        times = tokens_df[args.time_column].to_numpy() if args.time_column else None
+        metrics = repetition_metrics(tokens, offsets, video_ids, times, args.window_tokens, args.window_seconds)
+        metrics.to_csv(sys.stdout, sep='\t')
@@ -0,0 +1,191 @@
+import argparse
+import base64
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import urllib.request
+
+import altair as alt
+from markdown_it import MarkdownIt
+
+import chart_data
+import content
+from corpora import DEFAULT_CORPUS, get_corpus
+
+# renders the markdown of the page the way streamlit does (CommonMark)
+MARKDOWN = MarkdownIt()
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>What makes comprehensible input comprehensible?</title>
+<link rel="icon" href="data:image/svg+xml;base64,{favicon}">
+{scripts}
+<style>
+body {{ background-color: #f6f8fb; font-family: sans-serif; max-width: 760px; margin: 0 auto; padding: 2rem 1rem; }}
+.chart {{ width: 100%; margin: 1.5rem 0; }}
+.dataframe-div {{ background-color: white; overflow-x: auto; }}
+blockquote {{ border-left: 3px solid #ccc; margin-left: 0; padding-left: 1rem; }}
+img {{ width: 100%; }}
+</style>
+</head>
+<body>
+<p>A data analysis of {title}.
+The interactive version is <a href="https://cij-analysis.streamlit.app/">here</a>.</p>
+{body}
+<script>
+const specs = {specs};
+for (const [name, spec] of Object.entries(specs)) {{
+    vegaEmbed('#' + name, spec, {{actions: false}});
+}}
+</script>
+</body>
+</html>
+"""
+
+# the scripts that render the charts, in the versions altair's specs are written for
+SCRIPTS = [
+    ('vega', alt.VEGA_VERSION),
+    ('vega-lite', alt.VEGALITE_VERSION),
+    ('vega-embed', alt.VEGAEMBED_VERSION),
+]
+
+def cdn_url(name, version):
+
+    return f'https://cdn.jsdelivr.net/npm/{name}@{version}'
+
+# Copies the scripts into out/vendor (from scripts_dir if given, otherwise downloaded once from the CDN) so
+# the report works offline and under a strict CSP, and returns their paths relative to the page. If they
+# can't be fetched, the page falls back to loading them from the CDN.
+def vendor_scripts(out, scripts_dir=None):
+
+    vendor_dir = os.path.join(out, 'vendor')
+    os.makedirs(vendor_dir, exist_ok=True)
+    sources = []
+
+    for name, version in SCRIPTS:
+        filename = f'{name}.min.js'
+        path = os.path.join(vendor_dir, filename)
+        try:
+            if scripts_dir:
+                shutil.copyfile(os.path.join(scripts_dir, filename), path)
+            elif not os.path.exists(path):
+                with urllib.request.urlopen(cdn_url(name, version), timeout=30) as response:
+                    script = response.read()
+                with open(path, 'wb') as f:
+                    f.write(script)
+            sources.append(f'vendor/{filename}')
+        except OSError as error:
+            print(f"Could not bundle {filename} ({error}), the report will load it from the CDN", file=sys.stderr)
+            sources.append(cdn_url(name, version))
+
+    return sources
+
+# gives headings the anchors streamlit gives them (e.g. #how-fast-is-ci), so the links between sections work
+def heading_anchors(body):
+
+    def add_anchor(match):
+        slug = re.sub(r'[^a-z0-9]+', '-', re.sub(r'<[^>]+>', '', match.group(2)).lower()).strip('-')
+        return f'<h{match.group(1)} id="{slug}">{match.group(2)}</h{match.group(1)}>'
+
+    return re.sub(r'<h([1-6])>(.*?)</h\1>', add_anchor, body)
+
+# builds every section of the page (see content.py), with the default variant of every chart, and returns
+# (html, json-serializable bundle). The interactive widgets of the app are left out.
+def build_report(corpus=DEFAULT_CORPUS, scripts=None):
+
+    body = []
+    specs = {}
+    bundle = {'generated': time.strftime('%Y-%m-%dT%H:%M:%S'), 'corpus': corpus, 'sections': []}
+
+    for section_name, blocks in content.SECTIONS:
+
+        section = {'name': section_name, 'items': []}
+
+        for block in blocks:
+
+            kind = block[0]
+
+            if kind == 'markdown':
+                body.append(heading_anchors(MARKDOWN.render(block[1])))
+                section['items'].append({'kind': kind, 'text': block[1]})
+                continue
+
+            if kind == 'list':
+                _, name, items = block
+                body.append('<ol>' + ''.join(f'<li>{html.escape(item)}</li>' for item in items) + '</ol>')
+                section['items'].append({'kind': kind, 'name': name, 'items': items})
+                continue
+
+            if kind == 'app':
+                continue
+
+            _, name, builder, kwargs = block
+            result = builder(**kwargs, corpus=corpus)
+
+            if kind == 'chart':
+                # in url mode (see chart_data.py) the cached charts are specs pointing at the app's static files,
+                # which the report doesn't ship, so their data goes back inline
+                spec = result.to_dict() if isinstance(result, alt.TopLevelMixin) else chart_data.inline_spec(result)
+                specs[name] = spec
+                body.append(f'<div class="chart" id="{name}"></div>')
+                section['items'].append({'kind': kind, 'name': name, 'spec': spec})
+
+            elif kind == 'table':
+                body.append('<div class="dataframe-div">' + result.to_html() + '</div>')
+                section['items'].append({'kind': kind, 'name': name, 'data': json.loads(result.data.to_json(orient='split'))})
+
+            elif kind == 'image':
+                png = base64.b64encode(result).decode('ascii')
+                body.append(f'<img alt="{name}" src="data:image/png;base64,{png}">')
+                section['items'].append({'kind': kind, 'name': name, 'png_base64': png})
+
+        bundle['sections'].append(section)
+
+    with open('favicon.svg', 'rb') as f:
+        favicon = base64.b64encode(f.read()).decode('ascii')
+
+    page = PAGE.format(
+        favicon=favicon,
+        title=html.escape(get_corpus(corpus)['title']),
+        scripts='\n'.join(
+            f'<script src="{html.escape(source)}"></script>'
+            for source in (scripts or [cdn_url(name, version) for name, version in SCRIPTS])
+        ),
+        body='\n'.join(body),
+        # keeps a '</script>' inside the data from closing the script tag
+        specs=json.dumps(specs).replace('</', '<\\/')
+    )
+
+    return page, bundle
+
+# Usage:
+#   python report.py [--out report]
+#
+# Writes a static index.html (charts are rendered in the browser with vega-embed, shipped in vendor/) and a
+# report.json with the same chart specs, tables and images, so the analysis can be served from a CDN.
+# Without network access, pass --scripts with a directory holding vega.min.js, vega-lite.min.js and
+# vega-embed.min.js.
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Render the analysis to a static html/json bundle.')
+    parser.add_argument('--out', default='report', help='output directory')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='registered corpus to render (see corpora.py)')
+    parser.add_argument('--scripts', help='directory with the vega scripts to bundle, instead of downloading them')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.out, exist_ok=True)
+    page, bundle = build_report(args.corpus, vendor_scripts(args.out, args.scripts))
+
+    with open(os.path.join(args.out, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(page)
+    with open(os.path.join(args.out, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(bundle, f)
+
+    print(f"Wrote {args.out}/index.html and {args.out}/report.json in {time.perf_counter() - start:.2f}s")
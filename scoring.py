@@ -0,0 +1,135 @@
+import argparse
+import functools
+import sys
+
+import numpy as np
+import pandas as pd
+
+from corpora import DEFAULT_CORPUS, get_corpus
+
+LEVELS = get_corpus(DEFAULT_CORPUS)['levels']
+
+# the per-video features from video_data.tsv that the model uses
+FEATURES = [
+    'wpm',
+    'sps',
+    'mean_sentence_length',
+    'average_rel_reps',
+    'ne_spot',
+    'tfp_log_ranks_unique',
+    'adv_props',
+    'det_props',
+    'noun_props',
+    'sconj_props',
+    'wa_props',
+    'gai_props',
+    'kan_props',
+    'aux_props',
+    'num_props',
+    'pron_props',
+    'verb_props',
+]
+
+# A simple ordinal model: a ridge regression of the level (0 = Complete Beginner ... 3 = Advanced)
+# on the standardized features gives every video a continuous difficulty score, and three cutpoints
+# on that score split it back into the four levels. Since the score is linear, it breaks down exactly
+# into one contribution per feature.
+def fit(video_df, features=FEATURES, alpha=1.0):
+
+    X = video_df[features].to_numpy(dtype=np.float64)
+    y = video_df['level'].map({level: i for i, level in enumerate(LEVELS)}).to_numpy(dtype=np.float64)
+
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+
+    intercept = y.mean()
+    coef = np.linalg.solve(Z.T @ Z + alpha * np.eye(len(features)), Z.T @ (y - intercept))
+
+    scores = intercept + Z @ coef
+    cutpoints = np.array([best_cutpoint(scores, y, i) for i in range(1, len(LEVELS))])
+    # keeps the levels in order even if the data is very noisy
+    cutpoints = np.maximum.accumulate(cutpoints)
+
+    return {
+        'features': list(features),
+        'mean': mean,
+        'std': std,
+        'coef': coef,
+        'intercept': intercept,
+        'cutpoints': cutpoints,
+    }
+
+# the threshold between level i - 1 and level i that misclassifies the fewest videos of those two levels
+def best_cutpoint(scores, y, i):
+
+    mask = (y == i - 1) | (y == i)
+    order = np.argsort(scores[mask])
+    sorted_scores = scores[mask][order]
+    above = (y[mask][order] == i).astype(np.int64)
+
+    # errors when cutting just before position k: level i videos below the cut + level i - 1 videos above it
+    errors = np.concatenate([[0], np.cumsum(above)]) + np.concatenate([np.cumsum((1 - above)[::-1])[::-1], [0]])
+    k = int(np.argmin(errors))
+
+    if k == 0:
+        return sorted_scores[0]
+    if k == len(sorted_scores):
+        return sorted_scores[-1]
+    return (sorted_scores[k - 1] + sorted_scores[k]) / 2.0
+
+# scores a dataframe of feature rows (one row per video) in a single vectorized pass and returns the
+# predicted level, the continuous score and the contribution of every feature to that score.
+# Rows with a missing feature can't be scored: their predicted level is None and their score NaN
+def score(model, feature_df):
+
+    missing = [feature for feature in model['features'] if feature not in feature_df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+
+    X = feature_df[model['features']].to_numpy(dtype=np.float64)
+    contributions = (X - model['mean']) / model['std'] * model['coef']
+    scores = model['intercept'] + contributions.sum(axis=1)
+    level_ids = np.searchsorted(model['cutpoints'], scores, side='right')
+    # searchsorted puts NaN scores past the last cutpoint, which would read as Advanced
+    predicted_levels = np.where(np.isnan(scores), None, np.array(LEVELS, dtype=object)[level_ids])
+
+    result = pd.DataFrame(
+        contributions,
+        index=feature_df.index,
+        columns=[f'{feature}_contribution' for feature in model['features']]
+    )
+    result.insert(0, 'score', scores)
+    result.insert(0, 'predicted_level', predicted_levels)
+
+    return result
+
+@functools.lru_cache(maxsize=1)
+def load_model(path='video_data.tsv'):
+
+    return fit(pd.read_csv(path, sep='\t'))
+
+# Usage:
+#   python scoring.py candidates.tsv > graded.tsv
+#
+# The input is a tsv with one row per video and (at least) the FEATURES columns, as in video_data.tsv.
+# Raw transcripts need to go through the same tokenization pipeline as video_data.tsv first.
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Predict the CIJ level of videos from their features.')
+    parser.add_argument('path', help='tsv file with one row per video')
+    parser.add_argument('--training-data', default='video_data.tsv')
+    args = parser.parse_args()
+
+    model = load_model(args.training_data)
+    candidates = pd.read_csv(args.path, sep='\t')
+
+    graded = pd.concat([candidates, score(model, candidates)], axis=1)
+
+    incomplete = candidates[model['features']].isna()
+    for row in np.flatnonzero(incomplete.any(axis=1)):
+        columns = incomplete.columns[incomplete.iloc[row]]
+        print(f"Row {row} was not graded, missing: {', '.join(columns)}", file=sys.stderr)
+
+    graded.to_csv(sys.stdout, sep='\t', index=False)
@@ -0,0 +1,224 @@
+import argparse
+import os
+import re
+import string
+
+import numpy as np
+import pandas as pd
+
+from morae import count_morae_batch
+
+# Speaking rates from subtitle cues. A cue table has one row per cue (roughly one sentence), with
+#   video, start, end   the video number and the cue's timestamps in seconds
+#   words, syllables    how many words and syllables (morae, see morae.py) the cue's text has
+#
+# A video's speaking time is the time covered by its cues plus the gaps between cues of at most
+# max_gap seconds (pauses between sentences). Longer gaps are silences (music, scenery...) and don't count,
+# so a long pause doesn't make a video look slower than it's spoken.
+MAX_GAP = 2.0
+
+# the hours are optional, as WebVTT timestamps under an hour can leave them out (00:01.000)
+SRT_CUE = re.compile(
+    r'(?:(\d+):)?(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(?:(\d+):)?(\d{2}):(\d{2})[,.](\d{3})[^\n]*\n(.*?)(?:\n\s*\n|\Z)',
+    re.S
+)
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt')
+
+# anything but kana, whitespace and punctuation: kanji, latin letters, digits... whose words and morae
+# can't be counted from the text alone
+NON_READING = re.compile(
+    r'[^\u3041-\u3096\u309b\u309c\u30a1-\u30fc\uff66-\uff9f\s'
+    + re.escape(string.punctuation + '、。，．！？「」『』（）〜～…')
+    + ']'
+)
+
+# cues of an .srt (or .vtt) file, as a dataframe with start, end (in seconds) and text
+def read_subtitles(text):
+
+    matches = SRT_CUE.findall(text.replace('\r\n', '\n'))
+    if not matches:
+        return pd.DataFrame({'start': [], 'end': [], 'text': []})
+
+    fields = np.array([[field or 0 for field in match[:8]] for match in matches], dtype=np.float64)
+    seconds = fields[:, [0, 4]] * 3600 + fields[:, [1, 5]] * 60 + fields[:, [2, 6]] + fields[:, [3, 7]] / 1000
+
+    return pd.DataFrame({
+        'start': seconds[:, 0],
+        'end': seconds[:, 1],
+        # drops the positioning tags some files have, e.g. <i> or {\an8}
+        'text': [re.sub(r'<[^>]+>|\{[^}]*\}', '', match[8]).strip() for match in matches],
+    })
+
+# cue table of subtitle files named after their video (e.g. 938.srt). The cue texts must be the kana readings
+# with the words separated by spaces (as the tokenizer writes them), so the words are the whitespace
+# separated tokens and the syllables are counted with morae.py. Plain Japanese subtitles (with kanji and
+# no spaces) are refused rather than counted wrong: they need a tokenizer first, or a cue table.
+def read_cues(paths):
+
+    cues = []
+    for path in paths:
+        with open(path, encoding='utf-8-sig') as f:
+            video_cues = read_subtitles(f.read())
+        video_cues.insert(0, 'video', int(os.path.splitext(os.path.basename(path))[0]))
+        cues.append(video_cues)
+
+    cues = pd.concat(cues, ignore_index=True)
+
+    not_readings = cues['text'].str.contains(NON_READING)
+    if not_readings.any():
+        example = cues.loc[not_readings.idxmax()]
+        raise ValueError(
+            f"{not_readings.sum()} of {len(cues)} cues aren't kana readings (e.g. video {example['video']}: "
+            f"{example['text']!r}), so their words and morae can't be counted. Convert the subtitles to readings "
+            f"with the words separated by spaces, or pass a cue table with words and syllables columns."
+        )
+    # readings without any space would make every cue a single word
+    if len(cues) and not cues['text'].str.contains(r'\s').any():
+        raise ValueError(
+            "None of the cues have spaces between their words, so their words can't be counted. "
+            "Separate the words with spaces, or pass a cue table with words and syllables columns."
+        )
+    cues['words'] = cues['text'].str.split().str.len().fillna(0).astype(np.int64)
+    cues['syllables'] = count_morae_batch(cues['text'])
+
+    return cues
+
+# the cues plus the short gaps between them (with no words), sorted by video then start:
+# everything that counts as speaking time. Overlapping cues are merged first, so the time they share
+# is only counted once.
+def speaking_intervals(cues, max_gap=MAX_GAP):
+
+    cues = cues.sort_values(['video', 'start'], kind='stable')
+
+    video = cues['video'].to_numpy()
+    start = cues['start'].to_numpy(dtype=np.float64)
+    end = cues['end'].to_numpy(dtype=np.float64)
+    words = cues['words'].to_numpy(dtype=np.float64)
+    syllables = cues['syllables'].to_numpy(dtype=np.float64)
+
+    if len(cues) == 0:
+        return pd.DataFrame({'video': video, 'start': start, 'end': end, 'words': words, 'syllables': syllables})
+
+    # a cue starts a new interval unless it starts before the end of every earlier cue of its video
+    running_end = pd.Series(end).groupby(video).cummax().to_numpy()
+    same_video = video[1:] == video[:-1]
+    first = np.flatnonzero(np.concatenate([[True], ~same_video | (start[1:] > running_end[:-1])]))
+
+    video = video[first]
+    start = start[first]
+    end = np.maximum.reduceat(end, first)
+    words = np.add.reduceat(words, first)
+    syllables = np.add.reduceat(syllables, first)
+
+    # gaps between consecutive intervals of the same video
+    same_video = video[1:] == video[:-1]
+    gap_start = end[:-1]
+    gap_end = start[1:]
+    short = same_video & (gap_end - gap_start <= max_gap)
+
+    return pd.DataFrame({
+        'video': np.concatenate([video, video[:-1][short]]),
+        'start': np.concatenate([start, gap_start[short]]),
+        'end': np.concatenate([end, gap_end[short]]),
+        'words': np.concatenate([words, np.zeros(short.sum())]),
+        'syllables': np.concatenate([syllables, np.zeros(short.sum())]),
+    }).sort_values(['video', 'start'], kind='stable').reset_index(drop=True)
+
+# words per minute and syllables per second of every cue
+def sentence_rates(cues):
+
+    duration = (cues['end'] - cues['start']).to_numpy(dtype=np.float64)
+    duration = np.where(duration > 0, duration, np.nan)
+
+    return pd.DataFrame({
+        'video': cues['video'].to_numpy(),
+        'start': cues['start'].to_numpy(),
+        'wpm': 60.0 * cues['words'].to_numpy(dtype=np.float64) / duration,
+        'sps': cues['syllables'].to_numpy(dtype=np.float64) / duration,
+    }, index=cues.index)
+
+# the wpm and sps columns of video_data.tsv, one row per video
+def video_rates(cues, max_gap=MAX_GAP):
+
+    intervals = speaking_intervals(cues, max_gap)
+    video_ids, rows = np.unique(intervals['video'].to_numpy(), return_inverse=True)
+
+    seconds = np.bincount(rows, weights=(intervals['end'] - intervals['start']).to_numpy())
+    words = np.bincount(rows, weights=intervals['words'].to_numpy())
+    syllables = np.bincount(rows, weights=intervals['syllables'].to_numpy())
+    seconds_or_nan = np.where(seconds > 0, seconds, np.nan)
+
+    return pd.DataFrame({
+        'speaking_seconds': seconds,
+        'words': words,
+        'syllables': syllables,
+        'wpm': 60.0 * words / seconds_or_nan,
+        'sps': syllables / seconds_or_nan,
+    }, index=pd.Index(video_ids, name='video'))
+
+# wpm and sps over time: each video split into windows of window seconds, with the words and syllables
+# of a cue spread evenly over its duration (so a cue that straddles two windows counts in both)
+def rate_series(cues, window=60.0, max_gap=MAX_GAP):
+
+    intervals = speaking_intervals(cues, max_gap)
+    start = intervals['start'].to_numpy()
+    end = intervals['end'].to_numpy()
+    duration = end - start
+
+    # one piece per (interval, window it overlaps)
+    first = np.floor(start / window).astype(np.int64)
+    last = np.maximum(np.ceil(end / window).astype(np.int64) - 1, first)
+    pieces = last - first + 1
+    source = np.repeat(np.arange(len(intervals)), pieces)
+    window_ids = np.repeat(first, pieces) + (np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces))
+
+    piece_seconds = np.minimum(end[source], (window_ids + 1) * window) - np.maximum(start[source], window_ids * window)
+    piece_seconds = np.maximum(piece_seconds, 0.0)
+    share = np.divide(piece_seconds, duration[source], out=np.zeros_like(piece_seconds), where=duration[source] > 0)
+
+    series = pd.DataFrame({
+        'video': intervals['video'].to_numpy()[source],
+        'window': window_ids,
+        'speaking_seconds': piece_seconds,
+        'words': intervals['words'].to_numpy()[source] * share,
+        'syllables': intervals['syllables'].to_numpy()[source] * share,
+    }).groupby(['video', 'window'], sort=True).sum()
+
+    seconds_or_nan = series['speaking_seconds'].where(series['speaking_seconds'] > 0)
+    series['start'] = series.index.get_level_values('window') * window
+    series['wpm'] = 60.0 * series['words'] / seconds_or_nan
+    series['sps'] = series['syllables'] / seconds_or_nan
+
+    return series.reset_index()
+
+# Usage:
+#   python timing.py cues.tsv [--out timing] [--max-gap 2.0] [--window 60]
+#   python timing.py subtitles/*.srt [--out timing] ...
+#
+# cues.tsv has one row per subtitle cue with video, start, end, words and syllables columns. Subtitle files
+# (.srt or .vtt, named after their video) are read with read_cues instead.
+# Writes video_rates.tsv (one row per video) and rate_series.tsv (one row per video and window).
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compute speaking rates from subtitle cue timings.')
+    parser.add_argument('paths', nargs='+', help='tsv file with one row per cue, or .srt/.vtt subtitle files')
+    parser.add_argument('--out', default='timing', help='output directory')
+    parser.add_argument('--max-gap', type=float, default=MAX_GAP, help='longest pause (in seconds) counted as speaking time')
+    parser.add_argument('--window', type=float, default=60.0, help='window length (in seconds) of the rate series')
+    args = parser.parse_args()
+
+    if all(path.lower().endswith(SUBTITLE_EXTENSIONS) for path in args.paths):
+        try:
+            cues = read_cues(args.paths)
+        except ValueError as error:
+            parser.error(str(error))
+    elif len(args.paths) == 1:
+        cues = pd.read_csv(args.paths[0], sep='\t')
+    else:
+        parser.error('expected one cue table or only subtitle files')
+
+    os.makedirs(args.out, exist_ok=True)
+    video_rates(cues, args.max_gap).to_csv(os.path.join(args.out, 'video_rates.tsv'), sep='\t')
+    rate_series(cues, args.window, args.max_gap).to_csv(os.path.join(args.out, 'rate_series.tsv'), sep='\t', index=False)
+
+    print(f"Wrote {args.out}/video_rates.tsv and {args.out}/rate_series.tsv")
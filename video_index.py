@@ -0,0 +1,70 @@
+import numpy as np
+
+# One sorted index per metric column: the row order that sorts the column, the sorted values, and the
+# position of every row in that order. A range on a column is then two binary searches into the sorted
+# values, and further ranges only check the positions of the rows that are still left, so a query never
+# scans the whole table.
+#
+#   index = build_index(video_df, ['wpm', 'mean_sentence_length'])
+#   query(index, {'wpm': (100, 120), 'mean_sentence_length': (None, 8)}, levels=['Intermediate'])
+def build_index(video_df, columns):
+
+    index = {
+        'video_ids': video_df['video'].to_numpy(),
+        'levels': video_df['level'].to_numpy(),
+        'columns': {},
+    }
+
+    for column in columns:
+        values = video_df[column].to_numpy(dtype=np.float64)
+        # stable, so ties keep their table order (NaNs sort last and never match a range)
+        order = np.argsort(values, kind='stable')
+        positions = np.empty(len(order), dtype=np.int64)
+        positions[order] = np.arange(len(order))
+        index['columns'][column] = {'order': order, 'sorted': values[order], 'positions': positions}
+
+    return index
+
+# [start, stop) positions in the sorted column of the values within low <= value <= high
+# (None leaves that side open)
+def range_bounds(index, column, low=None, high=None):
+
+    column_index = index['columns'][column]
+    sorted_values = column_index['sorted']
+
+    start = 0 if low is None else int(np.searchsorted(sorted_values, low, side='left'))
+    if high is None:
+        # NaNs sort last, so an open upper bound stops at the last number
+        stop = len(sorted_values) - int(np.isnan(sorted_values).sum())
+    else:
+        stop = int(np.searchsorted(sorted_values, high, side='right'))
+
+    return start, max(start, stop)
+
+# rows matching every (low, high) range in ranges and, if given, one of levels
+def query_rows(index, ranges, levels=None):
+
+    if not ranges:
+        rows = np.arange(len(index['video_ids']))
+    else:
+        bounds = {column: range_bounds(index, column, low, high) for column, (low, high) in ranges.items()}
+
+        # starts from the narrowest range, so every later check only touches its rows
+        narrowest = min(bounds, key=lambda column: bounds[column][1] - bounds[column][0])
+        start, stop = bounds[narrowest]
+        rows = index['columns'][narrowest]['order'][start:stop]
+
+        for column, (start, stop) in bounds.items():
+            if column != narrowest:
+                positions = index['columns'][column]['positions'][rows]
+                rows = rows[(positions >= start) & (positions < stop)]
+
+    if levels is not None:
+        rows = rows[np.isin(index['levels'][rows], list(levels))]
+
+    return np.sort(rows)
+
+# ids of the videos matching every range and, if given, one of levels
+def query(index, ranges, levels=None):
+
+    return index['video_ids'][query_rows(index, ranges, levels)]
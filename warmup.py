@@ -0,0 +1,74 @@
+import sys
+import time
+
+from streamlit.web import cli as stcli
+
+import chart_data
+import charts
+import metrics
+
+# the level histograms, each with or without the medians and the density curves
+HISTOGRAMS = [
+    charts.get_wpm_chart,
+    charts.get_sentence_length_hist,
+    charts.get_repetition_hist,
+    charts.get_ne_spot_hist,
+    charts.get_tfplr_hist,
+    charts.get_sconj_hist,
+    charts.get_kango_hist,
+]
+
+# every cached builder and every variant of it that the page can request
+WARM_UP_CALLS = [
+    (charts.load_dataframes, {}),
+    (charts.get_wpm_vs_sps_chart, {'interactive': True}),
+    (charts.get_wpm_vs_sps_chart, {'interactive': False}),
+    (charts.get_word_coverage_chart, {'zoom': True}),
+    (charts.get_word_coverage_chart, {'zoom': False}),
+    (charts.get_level_partitions, {}),
+    (charts.get_effect_sizes, {}),
+    (charts.get_video_profiles, {}),
+    (charts.get_video_index, {}),
+    (charts.get_projection_map, {}),
+    (charts.get_feature_index, {}),
+    (charts.get_coverage_engine, {}),
+    (charts.render_vanilla_heatmap, {}),
+    (charts.render_level_row_unordered, {}),
+    (charts.render_level_col_ordered, {}),
+] + [
+    (histogram, {'show_medians': show_medians, 'show_density': show_density})
+    for histogram in HISTOGRAMS
+    for show_medians in (True, False)
+    for show_density in (True, False)
+] + [
+    (charts.get_drift_chart, {'column': column}) for column in charts.METRIC_LABELS
+]
+
+# fills the st.cache_data caches of the current process
+def warm_up():
+
+    start = time.perf_counter()
+
+    for func, kwargs in WARM_UP_CALLS:
+        func(**kwargs)
+
+    elapsed = time.perf_counter() - start
+    print(f"Warmed up {len(WARM_UP_CALLS)} cached calls in {elapsed:.2f}s")
+
+# Usage:
+#   python warmup.py                      warm up once and exit (build-time check)
+#   python warmup.py serve [options...]   warm up, then run the app in this same process
+#
+# Serving from the warmed process means the caches are already full by the time the
+# server starts listening, so /_stcore/health only passes once the replica is hot.
+if __name__ == '__main__':
+
+    warm_up()
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        metrics.start_server()
+        options = sys.argv[2:]
+        if chart_data.USE_URLS:
+            options.append('--server.enableStaticServing=true')
+        sys.argv = ['streamlit', 'run', 'app.py'] + options
+        sys.exit(stcli.main())
@@ -0,0 +1,200 @@
+import argparse
+import functools
+import os
+import sys
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+import coverage
+
+# A corpus's per-video word counts, stored in a directory as a CSR (videos x vocabulary) count matrix:
+#   indptr.npy, indices.npy, data.npy  the counts of video i are data[indptr[i]:indptr[i + 1]],
+#                                      for the words indices[indptr[i]:indptr[i + 1]] (sorted)
+#   vocab.txt                          one lemma per line, most common in the corpus first,
+#                                      so a word's token id + 1 is its corpus rank
+#   video_ids.npy                      the video number of each row, as in video_data.tsv
+#
+# Coverage, ne_spot, repetition and word rareness are all functions of these counts, so they can be
+# recomputed with a few vectorized passes over the matrix instead of re-parsing the transcripts.
+
+def normalize_word(word):
+
+    return unicodedata.normalize('NFKC', word).strip()
+
+# word -> token id, built once per vocabulary so looking up a word is one dict lookup
+def intern(vocab):
+
+    token_ids = {}
+    for i, word in enumerate(vocab):
+        token_ids.setdefault(normalize_word(word), i)
+
+    return token_ids
+
+# tokens_df has one row per token, with the video number in 'video' and the lemma in 'lemma'
+def build_word_counts(tokens_df):
+
+    lemmas = tokens_df['lemma'].map(normalize_word)
+
+    # token ids in order of corpus frequency (ties broken alphabetically, so builds are reproducible)
+    frequencies = lemmas.value_counts()
+    frequencies = frequencies.reset_index().sort_values(['count', 'lemma'], ascending=[False, True])
+    vocab = frequencies['lemma'].tolist()
+
+    video_ids, rows = np.unique(tokens_df['video'].to_numpy(), return_inverse=True)
+    token_ids = lemmas.map(intern(vocab)).to_numpy(dtype=np.int64)
+
+    # counting (row, token id) pairs gives the entries already sorted by row, then token id
+    pairs, data = np.unique(rows.astype(np.int64) * len(vocab) + token_ids, return_counts=True)
+    indices = pairs % len(vocab)
+    indptr = np.searchsorted(pairs // len(vocab), np.arange(len(video_ids) + 1), side='left')
+
+    return {
+        'indptr': indptr.astype(np.int64),
+        'indices': indices.astype(np.int32),
+        'data': data.astype(np.uint16 if data.max() < 2 ** 16 else np.uint32),
+        'vocab': vocab,
+        'video_ids': video_ids,
+    }
+
+def save_word_counts(directory, word_counts):
+
+    os.makedirs(directory, exist_ok=True)
+    for name in ('indptr', 'indices', 'data', 'video_ids'):
+        np.save(os.path.join(directory, f'{name}.npy'), word_counts[name])
+    with open(os.path.join(directory, 'vocab.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(word_counts['vocab']) + '\n')
+
+# the arrays are memory mapped, so every process on the machine shares one copy of the pages
+@functools.lru_cache(maxsize=None)
+def load_word_counts(directory):
+
+    with open(os.path.join(directory, 'vocab.txt'), encoding='utf-8') as f:
+        vocab = f.read().splitlines()
+
+    word_counts = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in ('indptr', 'indices', 'data')}
+    word_counts['video_ids'] = np.load(os.path.join(directory, 'video_ids.npy'))
+    word_counts['vocab'] = vocab
+    word_counts['token_ids'] = intern(vocab)
+
+    return word_counts
+
+# sum of values over every row, for values aligned with the stored entries
+# (a cumulative sum rather than np.add.reduceat, which doesn't handle empty rows)
+def row_sums(word_counts, values):
+
+    indptr = word_counts['indptr']
+    cumulative = np.concatenate([[0], np.cumsum(values)])
+
+    return cumulative[indptr[1:]] - cumulative[indptr[:-1]]
+
+def row_ids(word_counts):
+
+    return np.repeat(np.arange(len(word_counts['indptr']) - 1), np.diff(word_counts['indptr']))
+
+# smallest number of top corpus words that covers 98% of each video's tokens
+def ne_spot(word_counts, threshold=0.98):
+
+    indptr = word_counts['indptr']
+    data = np.asarray(word_counts['data'], dtype=np.int64)
+    totals = row_sums(word_counts, data)
+
+    # running token count within each row, in rank order (entries are sorted by token id)
+    running = np.cumsum(data) - np.repeat(np.concatenate([[0], np.cumsum(totals)[:-1]]), np.diff(indptr))
+    reached = running >= threshold * np.repeat(totals, np.diff(indptr))
+
+    # reached only flips once per row, so the first entry that reaches the threshold
+    # sits right after the ones that don't
+    first = indptr[:-1] + row_sums(word_counts, ~reached)
+    first = np.minimum(first, len(data) - 1)
+
+    return np.where(totals > 0, np.asarray(word_counts['indices'])[first].astype(np.int64) + 1, 0)
+
+# average_rel_reps of video_data.tsv is the share of a video's tokens taken up by each distinct word, averaged
+# over its distinct words. Those shares always sum to 1, so the column is the inverse of the number of distinct
+# words in the video: it doesn't depend on how often the words are repeated (see repetition.py for that)
+def rel_reps_from_distinct(distinct):
+
+    distinct = np.asarray(distinct, dtype=np.float64)
+
+    return np.where(distinct > 0, 1.0 / np.maximum(distinct, 1), np.nan)
+
+def average_rel_reps(word_counts):
+
+    return rel_reps_from_distinct(np.diff(word_counts['indptr']))
+
+# 25th percentile of the log ranks of each video's distinct words, with reference_ranks[token id] the rank
+# of every vocabulary word in an external frequency list (linear interpolation, as np.percentile)
+def tfp_log_ranks_unique(word_counts, reference_ranks, percentile=25):
+
+    indptr = word_counts['indptr']
+    distinct = np.diff(indptr)
+    rows = row_ids(word_counts)
+
+    log_ranks = np.log(np.asarray(reference_ranks, dtype=np.float64)[np.asarray(word_counts['indices'])])
+    # sorts the log ranks within each row
+    log_ranks = log_ranks[np.lexsort((log_ranks, rows))]
+
+    position = (percentile / 100.0) * np.maximum(distinct - 1, 0)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, np.maximum(distinct - 1, 0))
+    weight = position - low
+
+    low_values = log_ranks[np.minimum(indptr[:-1] + low, len(log_ranks) - 1)]
+    high_values = log_ranks[np.minimum(indptr[:-1] + high, len(log_ranks) - 1)]
+    return np.where(distinct > 0, low_values + weight * (high_values - low_values), np.nan)
+
+# the per-video coverage matrix of coverage.py (token id + 1 is the corpus rank)
+def coverage_matrix(word_counts):
+
+    return coverage.build_coverage_matrix(word_counts['indptr'], np.asarray(word_counts['indices']) + 1, word_counts['data'])
+
+# the vocabulary based columns of video_data.tsv, one row per video
+def recompute_metrics(word_counts, reference_ranks=None):
+
+    metrics = pd.DataFrame({
+        'ne_spot': ne_spot(word_counts),
+        'average_rel_reps': average_rel_reps(word_counts),
+    }, index=pd.Index(word_counts['video_ids'], name='video'))
+
+    if reference_ranks is not None:
+        metrics['tfp_log_ranks_unique'] = tfp_log_ranks_unique(word_counts, reference_ranks)
+
+    return metrics
+
+# Usage:
+#   python word_counts.py build tokens.tsv --out word_counts
+#   python word_counts.py metrics word_counts [--reference-ranks ranks.tsv] > metrics.tsv
+#
+# tokens.tsv has one row per token with (at least) a 'video' and a 'lemma' column.
+# ranks.tsv has a 'lemma' and a 'rank' column (the external frequency list used for word rareness).
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Build the per-video word counts and recompute metrics from them.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='build the count matrix from a tokens tsv')
+    build_parser.add_argument('path')
+    build_parser.add_argument('--out', default='word_counts', help='output directory')
+
+    metrics_parser = subparsers.add_parser('metrics', help='recompute the vocabulary based video_data.tsv columns')
+    metrics_parser.add_argument('directory')
+    metrics_parser.add_argument('--reference-ranks', help='tsv with a lemma and a rank column')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        word_counts = build_word_counts(pd.read_csv(args.path, sep='\t', usecols=['video', 'lemma']))
+        save_word_counts(args.out, word_counts)
+        print(f"Wrote {len(word_counts['video_ids'])} videos x {len(word_counts['vocab'])} words to {args.out}/")
+
+    else:
+        word_counts = load_word_counts(args.directory)
+        reference_ranks = None
+        if args.reference_ranks:
+            ranks = pd.read_csv(args.reference_ranks, sep='\t')
+            ranks = ranks.assign(lemma=ranks['lemma'].map(normalize_word)).drop_duplicates('lemma').set_index('lemma')['rank']
+            # words missing from the reference list count as rarer than all of it
+            reference_ranks = ranks.reindex(word_counts['vocab']).fillna(ranks.max() + 1).to_numpy()
+        recompute_metrics(word_counts, reference_ranks).to_csv(sys.stdout, sep='\t')
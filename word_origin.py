@@ -0,0 +1,141 @@
+import argparse
+import functools
+import hashlib
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from word_counts import load_word_counts, row_sums
+
+# Word origin (goshu) of every word: wago (native Japanese), kango (Sino-Japanese), gairaigo (loanwords),
+# or other (mixed origin, proper nouns, symbols...). The wa_props, kan_props and gai_props columns of
+# video_data.tsv are each origin's share of a video's tokens.
+ORIGINS = ['other', 'wago', 'kango', 'gairaigo']
+OTHER, WAGO, KANGO, GAIRAIGO = range(len(ORIGINS))
+
+# A lexicon (e.g. the goshu field of UniDic) is stored as two aligned arrays: the sorted 64 bit hashes of
+# its lemmas and their origin codes. Both are memory mapped, so the lexicon costs 9 bytes per word, is
+# shared by every process, and a lookup is a binary search.
+def word_hashes(words):
+
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little') for word in words],
+        dtype=np.uint64
+    )
+
+# lexicon_df has a lemma and an origin column (one of ORIGINS)
+def save_lexicon(directory, lexicon_df):
+
+    hashes = word_hashes(lexicon_df['lemma'])
+    origins = lexicon_df['origin'].map({origin: i for i, origin in enumerate(ORIGINS)}).fillna(OTHER).to_numpy(dtype=np.uint8)
+
+    order = np.argsort(hashes, kind='stable')
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'hashes.npy'), hashes[order])
+    np.save(os.path.join(directory, 'origins.npy'), origins[order])
+
+@functools.lru_cache(maxsize=None)
+def load_lexicon(directory):
+
+    return {
+        'hashes': np.load(os.path.join(directory, 'hashes.npy'), mmap_mode='r'),
+        'origins': np.load(os.path.join(directory, 'origins.npy'), mmap_mode='r'),
+    }
+
+KATAKANA = re.compile(r'^[゠-ヿｦ-ﾟ]+$')
+HIRAGANA = re.compile(r'[ぁ-ゟ]')
+KANJI = re.compile(r'[一-鿿々]')
+LATIN = re.compile(r'^[A-Za-zＡ-Ｚａ-ｚ]+$')
+
+# a guess from the script of a word that isn't in the lexicon: katakana (or latin) words are mostly
+# loanwords, kanji compounds mostly kango, and words with hiragana (including okurigana) mostly wago
+def origin_from_script(word):
+
+    if KATAKANA.match(word) or LATIN.match(word):
+        return GAIRAIGO
+    if HIRAGANA.search(word):
+        return WAGO
+    if KANJI.search(word):
+        return KANGO
+
+    return OTHER
+
+# origin codes of words, one per word. The text of a corpus repeats the same words over and over, so every
+# distinct word is only hashed and looked up once
+def classify_words(words, lexicon=None):
+
+    codes, distinct = pd.factorize(pd.Series(words, dtype=object))
+    distinct = list(distinct)
+    origins = np.full(len(distinct), OTHER, dtype=np.uint8)
+    found = np.zeros(len(distinct), dtype=bool)
+
+    if lexicon is not None and len(lexicon['hashes']):
+        hashes = word_hashes(distinct)
+        positions = np.minimum(np.searchsorted(lexicon['hashes'], hashes), len(lexicon['hashes']) - 1)
+        found = lexicon['hashes'][positions] == hashes
+        origins[found] = lexicon['origins'][positions[found]]
+
+    for i in np.flatnonzero(~found):
+        origins[i] = origin_from_script(distinct[i])
+
+    return origins[codes]
+
+# wa_props, kan_props and gai_props of every video from its word counts (see word_counts.py):
+# the vocabulary is classified once, then each origin is one row sum over the count matrix
+def origin_props(word_counts, lexicon=None):
+
+    vocab_origins = classify_words(word_counts['vocab'], lexicon)
+    entry_origins = vocab_origins[np.asarray(word_counts['indices'])]
+    data = np.asarray(word_counts['data'], dtype=np.int64)
+    totals = np.maximum(row_sums(word_counts, data), 1)
+
+    return pd.DataFrame({
+        f'{prefix}_props': row_sums(word_counts, np.where(entry_origins == origin, data, 0)) / totals
+        for prefix, origin in (('wa', WAGO), ('kan', KANGO), ('gai', GAIRAIGO))
+    }, index=pd.Index(word_counts['video_ids'], name='video'))
+
+# Usage:
+#   python word_origin.py lexicon lexicon.tsv --out lexicon          stores a lemma/origin tsv as a lexicon
+#   python word_origin.py props word_counts [--lexicon lexicon]      wa/kan/gai_props of every video
+#   python word_origin.py benchmark [--lexicon lexicon]              tokens per second on random words
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Classify words by origin (wago, kango, gairaigo).')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lexicon_parser = subparsers.add_parser('lexicon')
+    lexicon_parser.add_argument('path', help='tsv with a lemma and an origin column')
+    lexicon_parser.add_argument('--out', default='lexicon')
+
+    props_parser = subparsers.add_parser('props')
+    props_parser.add_argument('directory', help='word counts directory (see word_counts.py)')
+    props_parser.add_argument('--lexicon')
+
+    benchmark_parser = subparsers.add_parser('benchmark')
+    benchmark_parser.add_argument('--lexicon')
+    benchmark_parser.add_argument('--tokens', type=int, default=5000000)
+
+    args = parser.parse_args()
+    lexicon = load_lexicon(args.lexicon) if getattr(args, 'lexicon', None) and args.command != 'lexicon' else None
+
+    if args.command == 'lexicon':
+        save_lexicon(args.out, pd.read_csv(args.path, sep='\t'))
+        print(f"Wrote {args.out}/hashes.npy and {args.out}/origins.npy")
+
+    elif args.command == 'props':
+        origin_props(load_word_counts(args.directory), lexicon).to_csv(sys.stdout, sep='\t')
+
+    else:
+        # a zipf-like stream over 30k distinct words, about the shape of the CIJ vocabulary
+        rng = np.random.default_rng(0)
+        vocab = np.array([f'単語{i}' if i % 3 else f'ワード{i}' for i in range(30000)], dtype=object)
+        tokens = vocab[(rng.zipf(1.3, args.tokens) - 1) % len(vocab)]
+
+        start = time.perf_counter()
+        classify_words(tokens, lexicon)
+        seconds = time.perf_counter() - start
+        print(f"{args.tokens:,} tokens in {seconds:.2f}s ({args.tokens / seconds / 1e6:.1f}M tokens/s)")